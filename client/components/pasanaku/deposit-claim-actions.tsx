@@ -22,8 +22,8 @@ import {
 	ItemActions,
 } from "@/components/ui/item";
 import { CheckIcon, InfoIcon } from "lucide-react";
-import { PASANAKU_ADDRESS } from "@/lib/contract";
-import { pasanakuAbi } from "@/lib/abi";
+import { PASANAKU_ADDRESS, PASANAKU_VIEWS_ADDRESS } from "@/lib/contract";
+import { pasanakuAbi, pasanakuLensAbi } from "@/lib/abi";
 import { getDecimals, getSymbol } from "@/lib/supported-assets";
 import { TokenAllowanceGate } from "./token-allowance-gate";
 import { ResponsiveActionModal } from "@/components/common/responsive-action-modal";
@@ -56,15 +56,15 @@ export function DepositClaimActions({
 	const [depositModalOpen, setDepositModalOpen] = useState(false);
 
 	const { data: canClaim, refetch: refetchCanClaim } = useReadContract({
-		address: PASANAKU_ADDRESS,
-		abi: pasanakuAbi,
+		address: PASANAKU_VIEWS_ADDRESS,
+		abi: pasanakuLensAbi,
 		functionName: "can_claim",
 		args: address !== undefined ? [address, tokenId] : undefined,
 	});
 
 	const { data: canDeposit, refetch: refetchCanDeposit } = useReadContract({
-		address: PASANAKU_ADDRESS,
-		abi: pasanakuAbi,
+		address: PASANAKU_VIEWS_ADDRESS,
+		abi: pasanakuLensAbi,
 		functionName: "can_deposit",
 		args: address !== undefined ? [address, tokenId] : undefined,
 	});
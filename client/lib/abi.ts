@@ -826,36 +826,59 @@ export const pasanakuAbi = [
 		],
 	},
 	{
-		stateMutability: "view",
+		stateMutability: "pure",
 		type: "function",
-		name: "total_deposited",
-		inputs: [
+		name: "protocol_fee",
+		inputs: [],
+		outputs: [
 			{
-				name: "token_id",
+				name: "",
 				type: "uint256",
 			},
 		],
+	},
+	{
+		stateMutability: "view",
+		type: "function",
+		name: "supported_assets",
+		inputs: [],
 		outputs: [
 			{
 				name: "",
-				type: "uint256",
+				type: "address[3]",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "expected_total_deposited",
+		name: "has_deposited",
 		inputs: [
+			{
+				name: "account",
+				type: "address",
+			},
 			{
 				name: "token_id",
 				type: "uint256",
 			},
 			{
-				name: "participant",
-				type: "address",
+				name: "index",
+				type: "uint256",
+			},
+		],
+		outputs: [
+			{
+				name: "",
+				type: "bool",
 			},
 		],
+	},
+	{
+		stateMutability: "view",
+		type: "function",
+		name: "next_token_id",
+		inputs: [],
 		outputs: [
 			{
 				name: "",
@@ -863,10 +886,28 @@ export const pasanakuAbi = [
 			},
 		],
 	},
+	{
+		stateMutability: "payable",
+		type: "constructor",
+		inputs: [
+			{
+				name: "base_uri_",
+				type: "string",
+			},
+			{
+				name: "supported_assets",
+				type: "address[3]",
+			},
+		],
+		outputs: [],
+	},
+] as const;
+
+export const pasanakuLensAbi = [
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "beneficiary",
+		name: "total_deposited",
 		inputs: [
 			{
 				name: "token_id",
@@ -876,40 +917,36 @@ export const pasanakuAbi = [
 		outputs: [
 			{
 				name: "",
-				type: "address",
+				type: "uint256",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "can_claim",
+		name: "expected_total_deposited",
 		inputs: [
-			{
-				name: "participant",
-				type: "address",
-			},
 			{
 				name: "token_id",
 				type: "uint256",
 			},
+			{
+				name: "participant",
+				type: "address",
+			},
 		],
 		outputs: [
 			{
 				name: "",
-				type: "bool",
+				type: "uint256",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "can_deposit",
+		name: "beneficiary",
 		inputs: [
-			{
-				name: "participant",
-				type: "address",
-			},
 			{
 				name: "token_id",
 				type: "uint256",
@@ -918,14 +955,14 @@ export const pasanakuAbi = [
 		outputs: [
 			{
 				name: "",
-				type: "bool",
+				type: "address",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "can_recover",
+		name: "can_claim",
 		inputs: [
 			{
 				name: "participant",
@@ -946,8 +983,12 @@ export const pasanakuAbi = [
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "participants_count",
+		name: "can_deposit",
 		inputs: [
+			{
+				name: "participant",
+				type: "address",
+			},
 			{
 				name: "token_id",
 				type: "uint256",
@@ -956,82 +997,67 @@ export const pasanakuAbi = [
 		outputs: [
 			{
 				name: "",
-				type: "uint256",
+				type: "bool",
 			},
 		],
 	},
 	{
-		stateMutability: "pure",
+		stateMutability: "view",
 		type: "function",
-		name: "protocol_fee",
-		inputs: [],
-		outputs: [
+		name: "can_recover",
+		inputs: [
 			{
-				name: "",
+				name: "participant",
+				type: "address",
+			},
+			{
+				name: "token_id",
 				type: "uint256",
 			},
 		],
-	},
-	{
-		stateMutability: "view",
-		type: "function",
-		name: "supported_assets",
-		inputs: [],
 		outputs: [
 			{
 				name: "",
-				type: "address[3]",
+				type: "bool",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "has_deposited",
+		name: "participants_count",
 		inputs: [
-			{
-				name: "account",
-				type: "address",
-			},
 			{
 				name: "token_id",
 				type: "uint256",
 			},
-			{
-				name: "index",
-				type: "uint256",
-			},
 		],
 		outputs: [
 			{
 				name: "",
-				type: "bool",
+				type: "uint256",
 			},
 		],
 	},
 	{
 		stateMutability: "view",
 		type: "function",
-		name: "next_token_id",
+		name: "PASANAKU",
 		inputs: [],
 		outputs: [
 			{
 				name: "",
-				type: "uint256",
+				type: "address",
 			},
 		],
 	},
 	{
-		stateMutability: "payable",
+		stateMutability: "nonpayable",
 		type: "constructor",
 		inputs: [
 			{
-				name: "base_uri_",
-				type: "string",
-			},
-			{
-				name: "supported_assets",
-				type: "address[3]",
+				name: "pasanaku_",
+				type: "address",
 			},
 		],
 		outputs: [],
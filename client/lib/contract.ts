@@ -1,4 +1,16 @@
-import { Address } from "viem";
+import { Address, zeroAddress } from "viem";
 
+// Written by `mox run deploy`, which deploys the lens against the core
 export const PASANAKU_ADDRESS =
 	"0x530a4cBdC461181519E5459309411710e8C23EE6" as Address;
+
+// Serves the derived views (`can_claim`, `can_deposit`, ...) of the core
+export const PASANAKU_LENS_ADDRESS =
+	"0x0000000000000000000000000000000000000000" as Address;
+
+// A core deployed before the lens serves the same views itself, with the
+// same signatures, so they are read from it until a lens is deployed
+export const PASANAKU_VIEWS_ADDRESS =
+	PASANAKU_LENS_ADDRESS === zeroAddress
+		? PASANAKU_ADDRESS
+		: PASANAKU_LENS_ADDRESS;
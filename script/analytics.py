@@ -0,0 +1,488 @@
+"""Vectorized cash-flow and default-risk analytics over `Pasanaku` event history.
+
+`History` collects `RotatingSavingsCreated`, `ParticipantsCommitted`,
+`Renewed`, `Deposited`, `Claimed`, `Recovered` and `Ended` events into columns
+and `History.ledger()` freezes them into NumPy arrays. Each cycle of a renewed
+game is its own game row, so the metrics of a token ID may span several rows.
+The metrics below work on whole columns at once instead of calling
+`rotating_savings()` and `has_deposited()` per game, so millions of events are
+processed in seconds. Amounts stay in integer base units of their asset, held
+as Python ints in object arrays so sums of 18 decimal amounts are exact;
+`to_units()` scales them for display only.
+
+    mox run analytics
+"""
+
+import random
+import time
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+from script import mock_erc20s
+from script import model as Model
+
+DEPOSITED = 0
+CLAIMED = 1
+RECOVERED = 2
+
+_FLOW_KINDS = {"Deposited": DEPOSITED, "Claimed": CLAIMED, "Recovered": RECOVERED}
+
+
+class Ledger(NamedTuple):
+    """Columnar event history.
+
+    `game_*` columns have one row per game cycle, `seat_*` columns one row per
+    participant slot and `flow_*` columns one row per `Deposited`, `Claimed`
+    or `Recovered` event. Games and accounts are referenced by row and code,
+    which index into `game_token_id` and `accounts`.
+    `game_amount` and `flow_amount` hold integer base units. Games created by
+    `create_committed` are flagged in `game_committed`.
+    """
+
+    assets: np.ndarray
+    asset_decimals: np.ndarray
+    accounts: np.ndarray
+    game_token_id: np.ndarray
+    game_asset: np.ndarray
+    game_amount: np.ndarray
+    game_size: np.ndarray
+    game_created_at: np.ndarray
+    game_ended: np.ndarray
+    game_committed: np.ndarray
+    seat_game: np.ndarray
+    seat_account: np.ndarray
+    seat_position: np.ndarray
+    flow_kind: np.ndarray
+    flow_game: np.ndarray
+    flow_account: np.ndarray
+    flow_index: np.ndarray
+    flow_amount: np.ndarray
+    flow_timestamp: np.ndarray
+
+
+class History:
+    """Accumulates decoded events.
+
+    `decimals` maps each asset address to its decimals.
+    """
+
+    def __init__(self, decimals: Mapping[str, int]):
+        self._decimals = {str(asset): d for asset, d in decimals.items()}
+        self._assets: dict[str, int] = {}
+        self._accounts: dict[str, int] = {}
+        # token ID => game row of its current cycle
+        self._games: dict[int, int] = {}
+        self._game_columns = ([], [], [], [], [])
+        self._ended: list[int] = []
+        self._committed: list[int] = []
+        self._seat_columns = ([], [], [])
+        self._flow_columns = ([], [], [], [], [], [])
+
+    def __len__(self) -> int:
+        return (
+            len(self._game_columns[0])
+            + len(self._flow_columns[0])
+            + len(self._ended)
+            + len(self._committed)
+        )
+
+    def _code(self, codes: dict[str, int], address) -> int:
+        return codes.setdefault(str(address), len(codes))
+
+    def _game(self, token_id: int) -> int:
+        try:
+            return self._games[token_id]
+        except KeyError:
+            raise ValueError(f"no RotatingSavingsCreated event for token {token_id}")
+
+    def record(self, name: str, fields: Mapping, timestamp: int):
+        """Add the event `name` with its decoded `fields`, mined at `timestamp`."""
+        if name == "RotatingSavingsCreated":
+            asset = str(fields["asset"])
+            if asset not in self._decimals:
+                raise ValueError(f"no decimals for asset {asset}")
+            row = len(self._game_columns[0])
+            self._games[fields["token_id"]] = row
+            participants = fields["participants"]
+            for column, value in zip(
+                self._game_columns,
+                (
+                    fields["token_id"],
+                    self._code(self._assets, asset),
+                    fields["amount"],
+                    len(participants),
+                    fields["created_at"],
+                ),
+            ):
+                column.append(value)
+            self._add_seats(row, participants)
+        elif name == "Renewed":
+            previous = self._game(fields["token_id"])
+            row = len(self._game_columns[0])
+            self._games[fields["token_id"]] = row
+            for column, value in zip(
+                self._game_columns,
+                (
+                    fields["token_id"],
+                    self._game_columns[1][previous],
+                    self._game_columns[2][previous],
+                    len(fields["participants"]),
+                    fields["renewed_at"],
+                ),
+            ):
+                column.append(value)
+            self._add_seats(row, fields["participants"])
+        elif name in _FLOW_KINDS:
+            row = self._game(fields["token_id"])
+            for column, value in zip(
+                self._flow_columns,
+                (
+                    _FLOW_KINDS[name],
+                    row,
+                    self._code(self._accounts, fields["participant"]),
+                    fields["index"],
+                    fields["amount"],
+                    timestamp,
+                ),
+            ):
+                column.append(value)
+        elif name == "Ended":
+            self._ended.append(self._game(fields["token_id"]))
+        elif name == "ParticipantsCommitted":
+            # The participant list itself comes with `RotatingSavingsCreated`
+            self._committed.append(self._game(fields["token_id"]))
+        # Other events (ERC-1155 transfers, ownership) carry no cash flow
+
+    def record_log(self, event, timestamp: int):
+        """Add an event decoded by boa, e.g. from `contract.get_logs()`."""
+        self.record(type(event).__name__, event._asdict(), timestamp)
+
+    def _add_seats(self, row: int, participants):
+        games, accounts, positions = self._seat_columns
+        for position, participant in enumerate(participants):
+            games.append(row)
+            accounts.append(self._code(self._accounts, participant))
+            positions.append(position)
+
+    def ledger(self) -> Ledger:
+        """Return the events recorded so far as NumPy columns."""
+        token_ids, assets, amounts, sizes, created_at = self._game_columns
+        ended = np.zeros(len(token_ids), dtype=bool)
+        ended[np.asarray(self._ended, dtype=np.int64)] = True
+        committed = np.zeros(len(token_ids), dtype=bool)
+        committed[np.asarray(self._committed, dtype=np.int64)] = True
+        kinds, games, accounts, indexes, flow_amounts, timestamps = self._flow_columns
+        seat_games, seat_accounts, positions = self._seat_columns
+        return Ledger(
+            assets=np.array(list(self._assets), dtype=object),
+            asset_decimals=np.array(
+                [self._decimals[asset] for asset in self._assets], dtype=np.int64
+            ),
+            accounts=np.array(list(self._accounts), dtype=object),
+            game_token_id=np.array(token_ids, dtype=np.int64),
+            game_asset=np.array(assets, dtype=np.int64),
+            game_amount=_amounts(amounts),
+            game_size=np.array(sizes, dtype=np.int64),
+            game_created_at=np.array(created_at, dtype=np.int64),
+            game_ended=ended,
+            game_committed=committed,
+            seat_game=np.array(seat_games, dtype=np.int64),
+            seat_account=np.array(seat_accounts, dtype=np.int64),
+            seat_position=np.array(positions, dtype=np.int64),
+            flow_kind=np.array(kinds, dtype=np.int8),
+            flow_game=np.array(games, dtype=np.int64),
+            flow_account=np.array(accounts, dtype=np.int64),
+            flow_index=np.array(indexes, dtype=np.int64),
+            flow_amount=_amounts(flow_amounts),
+            flow_timestamp=np.array(timestamps, dtype=np.int64),
+        )
+
+
+def _amounts(values) -> np.ndarray:
+    """Return `values` as an object array of Python ints, which cannot overflow."""
+    ret = np.empty(len(values), dtype=object)
+    ret[:] = [int(value) for value in values]
+    return ret
+
+
+def _sum(index: np.ndarray, amounts: np.ndarray, count: int) -> np.ndarray:
+    """Return the exact sum of `amounts` per `index`, like weighted `np.bincount`."""
+    ret = np.zeros(count, dtype=object)
+    np.add.at(ret, index, amounts)
+    return ret
+
+
+def to_units(amounts: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    """Scale base-unit `amounts` to float64 whole units, for display only."""
+    return np.array(
+        [amount / 10**d for amount, d in zip(amounts, decimals)], dtype=np.float64
+    )
+
+
+# --- Derived state ---
+
+
+class _Games(NamedTuple):
+    current_index: np.ndarray
+    recovered: np.ndarray
+    last_updated_at: np.ndarray
+    pot: np.ndarray
+    stalled: np.ndarray
+
+
+class _Pairs(NamedTuple):
+    """One row per (game, participant) pair, aggregated over duplicate seats."""
+
+    game: np.ndarray
+    account: np.ndarray
+    deposited: np.ndarray
+    received: np.ndarray
+    missing_now: np.ndarray
+    rounds_owed: np.ndarray
+
+
+def _games(ledger: Ledger, as_of: int) -> _Games:
+    count = len(ledger.game_token_id)
+    kind, game = ledger.flow_kind, ledger.flow_game
+    current_index = np.bincount(game[kind == CLAIMED], minlength=count)
+    recovered = np.bincount(game[kind == RECOVERED], minlength=count) > 0
+
+    # `recover` leaves `last_updated_at` untouched
+    last_updated_at = ledger.game_created_at.copy()
+    moved = kind != RECOVERED
+    np.maximum.at(last_updated_at, game[moved], ledger.flow_timestamp[moved])
+
+    # Deposits of the current round, less the ones recovered from it
+    at_current = (ledger.flow_index == current_index[game]) & (kind != CLAIMED)
+    signed = np.where(kind == DEPOSITED, ledger.flow_amount, -ledger.flow_amount)
+    pot = _sum(game[at_current], signed[at_current], count)
+
+    # A recovered game accepts no further deposits or claims, and a game
+    # untouched for `DAYS_30` is open to recovery
+    stalled = ~ledger.game_ended & (
+        recovered | (as_of - last_updated_at >= Model.DAYS_30)
+    )
+    return _Games(current_index, recovered, last_updated_at, pot, stalled)
+
+
+def _pairs(ledger: Ledger, games: _Games) -> _Pairs:
+    accounts = max(len(ledger.accounts), 1)
+    pair_key, seat_pair = np.unique(
+        ledger.seat_game * accounts + ledger.seat_account, return_inverse=True
+    )
+    count = len(pair_key)
+    current = games.current_index
+
+    flow_pair = np.searchsorted(
+        pair_key, ledger.flow_game * accounts + ledger.flow_account
+    )
+    kind, amount = ledger.flow_kind, ledger.flow_amount
+
+    def total(mask):
+        return _sum(flow_pair[mask], amount[mask], count)
+
+    def events(mask):
+        return np.bincount(flow_pair[mask], minlength=count)
+
+    deposited = total(kind == DEPOSITED) - total(kind == RECOVERED)
+    received = total(kind == CLAIMED)
+    at_current = ledger.flow_index == current[ledger.flow_game]
+    deposits_now = events(at_current & (kind == DEPOSITED)) - events(
+        at_current & (kind == RECOVERED)
+    )
+
+    seats = np.bincount(seat_pair, minlength=count)
+    ahead = ledger.seat_position >= current[ledger.seat_game]
+    seats_ahead = np.bincount(seat_pair, weights=ahead, minlength=count)
+    beneficiary_now = np.bincount(
+        seat_pair,
+        weights=ledger.seat_position == current[ledger.seat_game],
+        minlength=count,
+    )
+    game = pair_key // accounts
+    remaining = ledger.game_size[game] - current[game]
+    # In a game created by `create` a participant deposits once in every
+    # remaining round in which it is not the beneficiary, however many seats
+    # it holds. In a committed game every seat but the beneficiary's deposits,
+    # so a participant owes one deposit per seat it holds in each round, less
+    # the round in which each of its seats is paid out.
+    committed = ledger.game_committed[game]
+    owed = np.where(committed, seats * remaining, remaining) - seats_ahead
+    owed_now = np.where(committed, seats, remaining > 0) - beneficiary_now
+    rounds_owed = np.maximum(
+        owed - np.where(committed, deposits_now, deposits_now > 0), 0
+    ).astype(np.int64)
+
+    return _Pairs(
+        game=game,
+        account=pair_key % accounts,
+        deposited=deposited,
+        received=received,
+        missing_now=owed_now - deposits_now > 0,
+        rounds_owed=rounds_owed,
+    )
+
+
+# --- Metrics ---
+
+# Amount columns are exact base units of the row's asset, whose decimals are in
+# the `decimals` column; pass both to `to_units()` to display them
+
+
+def net_cash_flow(ledger: Ledger) -> dict[str, np.ndarray]:
+    """Return what each participant put into and took out of each game.
+
+    `deposited` is net of recovered deposits and `net` is `received - deposited`.
+    """
+    pairs = _pairs(ledger, _games(ledger, as_of=0))
+    return {
+        "token_id": ledger.game_token_id[pairs.game],
+        "account": ledger.accounts[pairs.account],
+        "asset": ledger.assets[ledger.game_asset[pairs.game]],
+        "decimals": ledger.asset_decimals[ledger.game_asset[pairs.game]],
+        "deposited": pairs.deposited,
+        "received": pairs.received,
+        "net": pairs.received - pairs.deposited,
+    }
+
+
+def outstanding_obligations(ledger: Ledger) -> dict[str, np.ndarray]:
+    """Return the deposits each participant still owes to unfinished games."""
+    pairs = _pairs(ledger, _games(ledger, as_of=0))
+    owing = pairs.rounds_owed > 0
+    game = pairs.game[owing]
+    return {
+        "token_id": ledger.game_token_id[game],
+        "account": ledger.accounts[pairs.account[owing]],
+        "asset": ledger.assets[ledger.game_asset[game]],
+        "decimals": ledger.asset_decimals[ledger.game_asset[game]],
+        "rounds": pairs.rounds_owed[owing],
+        "amount": pairs.rounds_owed[owing].astype(object) * ledger.game_amount[game],
+    }
+
+
+def defaults_after_payout(ledger: Ledger, as_of: int) -> dict[str, np.ndarray]:
+    """Return participants who were paid a pot and are missing from a stalled round.
+
+    A round is stalled when its game was recovered, or when it has not moved
+    for `DAYS_30` at `as_of`. `outstanding` is what the participant still owes.
+    """
+    games = _games(ledger, as_of)
+    pairs = _pairs(ledger, games)
+    defaulted = (
+        (pairs.received > 0)
+        & games.stalled[pairs.game]
+        & pairs.missing_now
+        & (pairs.rounds_owed > 0)
+    )
+    game = pairs.game[defaulted]
+    return {
+        "token_id": ledger.game_token_id[game],
+        "account": ledger.accounts[pairs.account[defaulted]],
+        "asset": ledger.assets[ledger.game_asset[game]],
+        "decimals": ledger.asset_decimals[ledger.game_asset[game]],
+        "received": pairs.received[defaulted],
+        "outstanding": pairs.rounds_owed[defaulted].astype(object)
+        * ledger.game_amount[game],
+    }
+
+
+def pot_at_risk(ledger: Ledger, as_of: int) -> dict[str, np.ndarray]:
+    """Return, per asset, the pots held for open games and the part in stalled games."""
+    games = _games(ledger, as_of)
+    assets = len(ledger.assets)
+    open_games = ~ledger.game_ended
+    return {
+        "asset": ledger.assets,
+        "decimals": ledger.asset_decimals,
+        "open_games": np.bincount(ledger.game_asset[open_games], minlength=assets),
+        "pot": _sum(ledger.game_asset, games.pot * open_games, assets),
+        "at_risk": _sum(ledger.game_asset, games.pot * games.stalled, assets),
+    }
+
+
+# --- Synthetic history ---
+
+
+def record_step(history: History, model: Model.Pasanaku, step: Model.Step):
+    """Record the events the contract logs for `step`, once it is applied to `model`."""
+    if step.reverted is not None or step.action == "warp":
+        return
+    if step.action in ("create", "create_committed"):
+        asset, participants, amount = step.args
+        fields = {
+            "participants": participants,
+            "asset": asset,
+            "amount": amount,
+            "token_id": step.result,
+            "created_at": step.timestamp,
+        }
+        history.record("RotatingSavingsCreated", fields, step.timestamp)
+        if step.action == "create_committed":
+            fields = {"token_id": step.result, "count": len(participants)}
+            history.record("ParticipantsCommitted", fields, step.timestamp)
+        return
+    if step.action == "renew":
+        fields = {
+            "token_id": step.args[0],
+            "cycle": step.result,
+            "participants": model.games[step.args[0]].participants,
+            "renewed_at": step.timestamp,
+        }
+        history.record("Renewed", fields, step.timestamp)
+        return
+
+    token_id = step.args[0]
+    action = step.action.removesuffix("_committed")
+    rs = model.games[token_id]
+    index = rs.current_index
+    if action == "claim":
+        index -= 1
+        if rs.ended:
+            history.record("Ended", {"token_id": token_id}, step.timestamp)
+    fields = {
+        "participant": step.sender,
+        "token_id": token_id,
+        "index": index,
+        "amount": step.result,
+    }
+    history.record(action.capitalize() + "ed", fields, step.timestamp)
+
+
+def moccasin_main():
+    rng = random.Random(0)
+    accounts = [f"0x{i:040x}" for i in range(1, 4097)]
+    assets = [
+        f"0x{i:040x}" for i in range(0x10000, 0x10000 + len(mock_erc20s.DECIMALS))
+    ]
+    labels = dict(zip(assets, mock_erc20s.DECIMALS))
+    decimals = dict(zip(assets, mock_erc20s.DECIMALS.values()))
+    model = Model.Pasanaku(assets)
+    history = History(decimals)
+    steps = 1_000_000
+
+    start = time.perf_counter()
+    timestamp = 0
+    for step in Model.random_trace(rng, model, accounts, assets, steps):
+        record_step(history, model, step)
+        timestamp = step.timestamp
+    ledger = history.ledger()
+    loaded = time.perf_counter()
+
+    flows = net_cash_flow(ledger)
+    obligations = outstanding_obligations(ledger)
+    defaults = defaults_after_payout(ledger, timestamp)
+    risk = pot_at_risk(ledger, timestamp)
+    elapsed = time.perf_counter() - loaded
+
+    print(f"events:      {len(history)} (generated in {loaded - start:.1f}s)")
+    print(f"metrics:     {elapsed:.2f}s")
+    print(f"positions:   {len(flows['token_id'])}")
+    print(f"obligations: {len(obligations['token_id'])}")
+    print(f"defaults:    {len(defaults['token_id'])}")
+    pots = to_units(risk["pot"], risk["decimals"])
+    at_risks = to_units(risk["at_risk"], risk["decimals"])
+    for asset, pot, at_risk in zip(risk["asset"], pots, at_risks):
+        print(f"{labels[asset]:<8} pot {pot:>16,.2f}  at risk {at_risk:>16,.2f}")
@@ -0,0 +1,135 @@
+"""Compare gas-optimized and codesize-optimized builds of `Pasanaku`.
+
+Compiles `src/pasanaku.vy` and `src/pasanaku_lens.vy` with each Vyper
+optimization level, then runs the same scenario against every build and
+reports the runtime code size, the deployment gas and the execution gas of
+each entry point. The scenario is fixed, so the numbers are reproducible
+and only change with the contracts or the compiler.
+
+boa keeps storage slots warm across calls, so execution gas is best read
+as a comparison between builds rather than as what a transaction pays.
+
+    mox run build_profiles
+"""
+
+import boa
+from vyper.compiler.settings import OptimizationLevel
+
+from script import compact
+from script import mock_erc20s
+
+PASANAKU_PATH = "src/pasanaku.vy"
+LENS_PATH = "src/pasanaku_lens.vy"
+BASE_URI = "https://pasanaku.com/api/v1/token/"
+
+PROFILES = {
+    "gas": OptimizationLevel.GAS,
+    "codesize": OptimizationLevel.CODESIZE,
+}
+
+PLAYERS_COUNT = 10
+AMOUNT = 100 * 10**6
+DAYS_30 = 60 * 60 * 24 * 30
+
+
+def _deploy(path: str, optimize: OptimizationLevel, *args) -> tuple[object, dict]:
+    deployer = boa.load_partial(path, compiler_args={"optimize": optimize})
+    contract = deployer.deploy(*args)
+    return contract, {
+        "runtime_bytes": len(deployer.compiler_data.bytecode_runtime),
+        "deploy_gas": contract._computation.get_gas_used(),
+    }
+
+
+def _scenario(pasanaku, lens, asset, players) -> dict[str, int]:
+    """Run every entry point once in a fixed order; return the gas of each call."""
+    gas = {}
+
+    def call(name, sender, fn, *args):
+        with boa.env.prank(sender):
+            fn(*args)
+        gas[name] = fn.contract._computation.get_gas_used()
+
+    def raw_call(name, sender, data):
+        computation = boa.env.raw_call(pasanaku.address, sender=sender, data=data)
+        gas[name] = computation.get_gas_used()
+
+    creator, first, second = players[0], players[1], players[2]
+    spec = (asset.address, players, AMOUNT)
+    call("create", creator, pasanaku.create, *spec)
+    call("create_many (4 games)", creator, pasanaku.create_many, [spec] * 4)
+    asset_index = list(pasanaku.supported_assets()).index(asset.address)
+    raw_call("create (compact)", creator, compact.encode_create(asset_index, *spec[1:]))
+
+    # Game 0 goes through the ABI entry points, game 1 through compact calldata
+    for player in players[1:]:
+        call("deposit", player, pasanaku.deposit, 0)
+        raw_call("deposit (compact)", player, compact.encode_deposit(1))
+    call("claim", players[0], pasanaku.claim, 0)
+    raw_call("claim (compact)", players[0], compact.encode_claim(1))
+
+    # Game 2 goes stale after one deposit
+    call("deposit (first of round)", second, pasanaku.deposit, 2)
+    call("can_recover (lens)", first, lens.can_recover, second, 2)
+    boa.env.time_travel(seconds=DAYS_30)
+    call("recover", second, pasanaku.recover, 2)
+
+    # A two-player game runs to its end and starts a second cycle
+    token_id = pasanaku.next_token_id()
+    with boa.env.prank(creator):
+        pasanaku.create(asset.address, [creator, first], AMOUNT)
+    for beneficiary, payer in ((creator, first), (first, creator)):
+        with boa.env.prank(payer):
+            pasanaku.deposit(token_id)
+        with boa.env.prank(beneficiary):
+            pasanaku.claim(token_id)
+    call("renew", creator, pasanaku.renew, token_id)
+
+    call("rotating_savings", first, pasanaku.rotating_savings, 0)
+    call("has_deposited", first, pasanaku.has_deposited, second, 0, 1)
+    call("can_deposit (lens)", first, lens.can_deposit, second, 0)
+    call("total_deposited (lens)", first, lens.total_deposited, 0)
+    return gas
+
+
+def compare() -> dict[str, dict]:
+    """Return the sizes and the gas of every entry point for each build profile."""
+    assets = mock_erc20s.deploy()
+    asset = assets[-2]  # USDC, 6 decimals
+    players = [boa.env.generate_address() for _ in range(PLAYERS_COUNT)]
+
+    report = {}
+    for name, optimize in PROFILES.items():
+        with boa.env.anchor():
+            pasanaku, pasanaku_sizes = _deploy(
+                PASANAKU_PATH, optimize, BASE_URI, [a.address for a in assets]
+            )
+            lens, lens_sizes = _deploy(LENS_PATH, optimize, pasanaku.address)
+            for player in players:
+                asset.faucet(player, AMOUNT * 20)
+                with boa.env.prank(player):
+                    asset.approve(pasanaku.address, AMOUNT * 20)
+            report[name] = {
+                "pasanaku": pasanaku_sizes,
+                "lens": lens_sizes,
+                "gas": _scenario(pasanaku, lens, asset, players),
+            }
+    return report
+
+
+def moccasin_main():
+    report = compare()
+    profiles = list(report)
+    header = "".join(f"{p:>12}" for p in profiles)
+
+    print(f"{'contract':<28}{header}")
+    for contract in ("pasanaku", "lens"):
+        for metric in ("runtime_bytes", "deploy_gas"):
+            row = "".join(f"{report[p][contract][metric]:>12}" for p in profiles)
+            print(f"{contract + ' ' + metric:<28}{row}")
+
+    print(f"\n{'entry point':<28}{header}")
+    for entry_point in report[profiles[0]]["gas"]:
+        row = "".join(f"{report[p]['gas'][entry_point]:>12}" for p in profiles)
+        print(f"{entry_point:<28}{row}")
+    return report
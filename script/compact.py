@@ -0,0 +1,153 @@
+"""Encoders for the compact calldata format decoded by `Pasanaku.__default__`.
+
+`moccasin_main` compares calldata size, L1 data gas and execution gas of the
+compact format against the ABI entry points on a local deployment.
+
+The compact `deposit` and `claim` post 31 fewer bytes than the ABI ones and
+cost about 230-290 gas more to execute. The compact `create` posts less than
+half the bytes, but decoding one participant at a time costs about 2.8k more
+execution gas than ABI decoding for 10 participants, so its `l2_gas` is
+higher. It only pays off where data posted to L1 is priced above the
+break-even ratio printed by `moccasin_main`, in L2 gas per unit of L1 data gas.
+"""
+
+import boa
+from eth_utils import to_canonical_address
+
+from src import pasanaku as Pasanaku
+from script import mock_erc20s
+
+# Opcodes and field sizes; must match src/pasanaku.vy
+COMPACT_DEPOSIT = 2
+COMPACT_CLAIM = 3
+COMPACT_CREATE = 4
+COMPACT_TOKEN_ID_SIZE = 4
+COMPACT_MANTISSA_SIZE = 8
+
+# Intrinsic gas of a transaction and EIP-2028 calldata gas per byte
+TX_BASE_GAS = 21_000
+ZERO_BYTE_GAS = 4
+NONZERO_BYTE_GAS = 16
+
+
+def encode_round_call(op: int, token_id: int) -> bytes:
+    return bytes([op]) + token_id.to_bytes(COMPACT_TOKEN_ID_SIZE, "big")
+
+
+def encode_deposit(token_id: int) -> bytes:
+    return encode_round_call(COMPACT_DEPOSIT, token_id)
+
+
+def encode_claim(token_id: int) -> bytes:
+    return encode_round_call(COMPACT_CLAIM, token_id)
+
+
+def split_amount(amount: int) -> tuple[int, int]:
+    """Split `amount` into `(mantissa, exponent)` with `amount == mantissa * 10**exponent`."""
+    mantissa, exponent = amount, 0
+    while mantissa and mantissa % 10 == 0 and exponent < 255:
+        mantissa //= 10
+        exponent += 1
+    if mantissa >= 2 ** (8 * COMPACT_MANTISSA_SIZE):
+        raise ValueError(f"amount {amount} has too many significant digits")
+    return mantissa, exponent
+
+
+def encode_create(asset_index: int, participants: list, amount: int) -> bytes:
+    """Encode `create`; `asset_index` is the position of the asset in `supported_assets()`."""
+    mantissa, exponent = split_amount(amount)
+    return (
+        bytes([COMPACT_CREATE, asset_index, exponent])
+        + mantissa.to_bytes(COMPACT_MANTISSA_SIZE, "big")
+        + b"".join(to_canonical_address(p) for p in participants)
+    )
+
+
+def calldata_gas(data: bytes) -> int:
+    """Return the EIP-2028 gas charged for `data` when posted as calldata."""
+    zeros = data.count(0)
+    return zeros * ZERO_BYTE_GAS + (len(data) - zeros) * NONZERO_BYTE_GAS
+
+
+def _scenario(pasanaku, asset, players, amount, compact: bool) -> dict[str, list]:
+    """Run create, every deposit and the claim of round 0; return the calls per entry point."""
+    supported_assets = list(pasanaku.supported_assets())
+    token_id = pasanaku.next_token_id()
+    calls = [
+        (
+            "create",
+            boa.env.eoa,
+            encode_create(supported_assets.index(asset.address), players, amount)
+            if compact
+            else pasanaku.create.prepare_calldata(asset.address, players, amount),
+        )
+    ]
+    for player in players[1:]:
+        data = (
+            encode_deposit(token_id)
+            if compact
+            else pasanaku.deposit.prepare_calldata(token_id)
+        )
+        calls.append(("deposit", player, data))
+    data = (
+        encode_claim(token_id) if compact else pasanaku.claim.prepare_calldata(token_id)
+    )
+    calls.append(("claim", players[0], data))
+
+    results = {}
+    for name, sender, data in calls:
+        computation = boa.env.raw_call(pasanaku.address, sender=sender, data=data)
+        results.setdefault(name, []).append((data, computation.get_gas_used()))
+    return results
+
+
+def compare(pasanaku, asset, players, amount) -> dict[str, dict]:
+    """Return calldata size and gas of each entry point for the ABI and compact formats."""
+    report = {}
+    for compact in (False, True):
+        with boa.env.anchor():
+            results = _scenario(pasanaku, asset, players, amount, compact)
+        for name, calls in results.items():
+            data, execution_gas = calls[-1]
+            report.setdefault(name, {})["compact" if compact else "abi"] = {
+                "calldata_bytes": len(data),
+                "l1_data_gas": calldata_gas(data),
+                "l2_gas": TX_BASE_GAS + calldata_gas(data) + execution_gas,
+            }
+    return report
+
+
+def moccasin_main():
+    assets = mock_erc20s.deploy()
+    pasanaku = Pasanaku.deploy(
+        "https://pasanaku.com/api/v1/token/", [a.address for a in assets]
+    )
+    asset = assets[-2]  # USDC, 6 decimals
+    amount = 100 * 10**6
+    players = [boa.env.generate_address() for _ in range(10)]
+    for player in players:
+        asset.faucet(player, amount * 20)
+        with boa.env.prank(player):
+            asset.approve(pasanaku.address, amount * 20)
+
+    report = compare(pasanaku, asset, players, amount)
+    print(
+        f"{'entry point':<12}{'format':<9}{'bytes':>7}{'L1 data gas':>13}{'L2 gas':>9}"
+    )
+    for name, formats in report.items():
+        for fmt, row in formats.items():
+            print(
+                f"{name:<12}{fmt:<9}{row['calldata_bytes']:>7}"
+                f"{row['l1_data_gas']:>13}{row['l2_gas']:>9}"
+            )
+    for name, formats in report.items():
+        abi, compact = formats["abi"], formats["compact"]
+        saved = abi["l1_data_gas"] - compact["l1_data_gas"]
+        extra = (compact["l2_gas"] - compact["l1_data_gas"]) - (
+            abi["l2_gas"] - abi["l1_data_gas"]
+        )
+        print(
+            f"{name}: compact saves {saved} L1 data gas for {extra} execution gas"
+            f" (break-even at {extra / saved:.2f} L2 gas per L1 data gas)"
+        )
+    return report
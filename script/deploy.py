@@ -1,5 +1,9 @@
+import os
+
 from src import pasanaku as Pasanaku
+from src import pasanaku_lens as PasanakuLens
 from moccasin.boa_tools import VyperContract
+from moccasin.config import get_active_network
 
 SUPPORTED_ASSETS = [
     "0xd24Eab8A12c6d42d4614493Eb2F3F9aD34b1CF5F",
@@ -7,10 +11,40 @@ SUPPORTED_ASSETS = [
     "0x1c97C5715F20445400716DB9b1EA2e82F873cF35",
 ]
 
+# The web client reads both addresses from this file
+CLIENT_CONTRACT_TS = os.path.join("client", "lib", "contract.ts")
+
+
+def write_client_addresses(pasanaku: str, lens: str, path: str = CLIENT_CONTRACT_TS):
+    with open(path, "w") as f:
+        f.write(
+            'import { Address, zeroAddress } from "viem";\n'
+            "\n"
+            "// Written by `mox run deploy`, which deploys the lens against the core\n"
+            "export const PASANAKU_ADDRESS =\n"
+            f'\t"{pasanaku}" as Address;\n'
+            "\n"
+            "// Serves the derived views (`can_claim`, `can_deposit`, ...) of the core\n"
+            "export const PASANAKU_LENS_ADDRESS =\n"
+            f'\t"{lens}" as Address;\n'
+            "\n"
+            "// A core deployed before the lens serves the same views itself, with the\n"
+            "// same signatures, so they are read from it until a lens is deployed\n"
+            "export const PASANAKU_VIEWS_ADDRESS =\n"
+            "\tPASANAKU_LENS_ADDRESS === zeroAddress\n"
+            "\t\t? PASANAKU_ADDRESS\n"
+            "\t\t: PASANAKU_LENS_ADDRESS;\n"
+        )
+
 
 def deploy() -> VyperContract:
     base_uri: str = "https://pasanaku-ten.vercel.app/api/v1/token/"
     pasanaku: VyperContract = Pasanaku.deploy(base_uri, SUPPORTED_ASSETS)
+    lens: VyperContract = PasanakuLens.deploy(pasanaku.address)
+    print(f"Pasanaku:     {pasanaku.address}")
+    print(f"PasanakuLens: {lens.address}")
+    if not get_active_network().is_local_or_forked_network():
+        write_client_addresses(pasanaku.address, lens.address)
     return pasanaku
 
 
@@ -0,0 +1,615 @@
+"""Push feed of `Pasanaku` game state over Server-Sent Events.
+
+`Feed` tails new blocks from a node, decodes the `Pasanaku` events of each
+block and applies them to a `Projection` holding every game and every
+ERC-1155 balance. Each event produces per-game and per-account deltas,
+which `Hub` pushes to the subscribers of those topics. Clients then stop
+polling `next_token_id`, `balanceOfBatch` and `rotating_savings`: the
+feed polls the node once per block for everyone, and a change reaches the
+browser one block after it is mined.
+
+HTTP endpoints served by `serve`:
+
+    GET /games/<token_id>     snapshot of one game
+    GET /accounts/<address>   ERC-1155 balances and games of one account
+    GET /stream?game=<token_id>&account=<address>
+                              SSE stream: a `snapshot` event per topic, then
+                              a `delta` event per change; with no query, the
+                              deltas of every topic
+
+Integers are sent as decimal strings, since amounts overflow JSON numbers
+in the browser. Games created by `create_committed` keep the participant
+list logged at creation, which `rotating_savings` does not return. The
+feed does not handle reorgs itself: start it with `--confirmations` on
+networks where they happen. A failing call to the node is logged and
+retried with backoff, and no event is applied twice.
+
+Against a local anvil node:
+
+    anvil
+    mox run feed --network anvil --private-key $ANVIL_KEY   # demo deployment
+    python -m script.feed http://127.0.0.1:8545 <pasanaku> --port 8080
+"""
+
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+import urllib.request
+from collections.abc import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+import boa
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+from vyper.compiler.output import build_abi_output
+
+from script import model as Model
+
+PASANAKU_PATH = "src/pasanaku.vy"
+
+# Largest block range requested by one `eth_getLogs` call
+BLOCK_RANGE = 2_000
+
+# Seconds between two polls of the node and between two SSE keep-alives
+POLL_INTERVAL = 1.0
+KEEPALIVE = 15.0
+
+# Longest wait between two polls while the node keeps failing
+MAX_BACKOFF = 60.0
+
+ZERO_ADDRESS = "0x" + "00" * 20
+
+logger = logging.getLogger(__name__)
+
+# Events that change the state of a game
+GAME_EVENTS = (
+    "RotatingSavingsCreated",
+    "Deposited",
+    "Claimed",
+    "Recovered",
+    "Ended",
+    "Renewed",
+)
+
+
+class Event(NamedTuple):
+    """A decoded log of the `Pasanaku` contract."""
+
+    name: str
+    fields: dict
+    block_number: int
+    log_index: int
+    timestamp: int
+
+
+class Delta(NamedTuple):
+    """A change pushed to the subscribers of `topic` (`game:<id>` or `account:<address>`)."""
+
+    topic: str
+    payload: dict
+
+
+def game_topic(token_id: int) -> str:
+    return f"game:{token_id}"
+
+
+def account_topic(account: str) -> str:
+    return f"account:{to_checksum_address(account)}"
+
+
+# --- Decoding ---
+
+
+class Decoder:
+    """Decodes raw logs with the event ABI of the contract."""
+
+    def __init__(self, abi: list[dict]):
+        self._events = {}
+        for event in abi:
+            if event["type"] != "event":
+                continue
+            types = [i["type"] for i in event["inputs"]]
+            signature = f"{event['name']}({','.join(types)})"
+            self._events["0x" + keccak(text=signature).hex()] = event
+
+    @property
+    def topics(self) -> list[str]:
+        """The `topic0` of every event, for an `eth_getLogs` filter."""
+        return list(self._events)
+
+    def decode(self, log: dict, timestamp: int) -> Event | None:
+        """Decode a JSON-RPC log; return `None` for an unknown event."""
+        topics = log["topics"]
+        event = self._events.get(topics[0]) if topics else None
+        if event is None:
+            return None
+        indexed = [i for i in event["inputs"] if i["indexed"]]
+        plain = [i for i in event["inputs"] if not i["indexed"]]
+        fields = {
+            i["name"]: decode([i["type"]], bytes.fromhex(topic[2:]))[0]
+            for i, topic in zip(indexed, topics[1:])
+        }
+        values = decode([i["type"] for i in plain], bytes.fromhex(log["data"][2:]))
+        fields.update((i["name"], value) for i, value in zip(plain, values))
+        for i in event["inputs"]:
+            if i["type"] == "address":
+                fields[i["name"]] = to_checksum_address(fields[i["name"]])
+            elif i["type"] == "address[]":
+                fields[i["name"]] = tuple(map(to_checksum_address, fields[i["name"]]))
+        return Event(
+            event["name"],
+            fields,
+            int(log["blockNumber"], 16),
+            int(log["logIndex"], 16),
+            timestamp,
+        )
+
+
+def pasanaku_abi(path: str = PASANAKU_PATH) -> list[dict]:
+    """Compile `path` and return its ABI."""
+    return build_abi_output(boa.load_partial(path).compiler_data)
+
+
+# --- Projection ---
+
+
+class Projection:
+    """In-memory state of every game and ERC-1155 balance, built from events."""
+
+    def __init__(self):
+        self.games: dict[int, Model.RotatingSavings] = {}
+        self.cycles: dict[int, int] = {}
+        # (account, token_id) => ERC-1155 balance
+        self.balances: dict[tuple[str, int], int] = {}
+
+    def game(self, token_id: int) -> dict | None:
+        rs = self.games.get(token_id)
+        if rs is None:
+            return None
+        ret = dict(zip(Model.RotatingSavings.__slots__, rs.as_tuple()))
+        ret["cycle"] = self.cycles.get(token_id, 0)
+        return ret
+
+    def account(self, account: str) -> dict:
+        account = to_checksum_address(account)
+        balances = {
+            token_id: balance
+            for (owner, token_id), balance in self.balances.items()
+            if owner == account and balance
+        }
+        games = sorted(
+            token_id
+            for token_id, rs in self.games.items()
+            if account in rs.participants
+        )
+        return {"account": account, "balances": balances, "games": games}
+
+    def apply(self, event: Event) -> list[Delta]:
+        """Apply `event` and return the deltas it produced."""
+        fields = event.fields
+        head = {"event": event.name, "block": event.block_number}
+        if event.name in ("TransferSingle", "TransferBatch"):
+            return self._transfer(event, head)
+        if event.name not in GAME_EVENTS:
+            # Ownership, roles, approvals, URIs and commitments
+            return []
+
+        token_id = fields["token_id"]
+        before = self.game(token_id) or {}
+        rs = self.games.get(token_id)
+        accounts = ()
+        if event.name == "RotatingSavingsCreated":
+            self.games[token_id] = Model.RotatingSavings(
+                tuple(fields["participants"]),
+                fields["asset"],
+                fields["amount"],
+                token_id,
+                fields["creator"],
+                fields["created_at"],
+            )
+            accounts = fields["participants"]
+        elif rs is None:
+            # Events of games created before the first block tailed
+            return []
+        elif event.name == "Deposited":
+            rs.total_deposited = fields["total_deposited"]
+            rs.last_updated_at = event.timestamp
+            accounts = (fields["participant"],)
+        elif event.name == "Claimed":
+            rs.current_index = fields["index"] + 1
+            rs.total_deposited = 0
+            rs.last_updated_at = event.timestamp
+            accounts = (fields["participant"],)
+        elif event.name == "Recovered":
+            rs.total_deposited -= fields["amount"]
+            rs.recovered = True
+            accounts = (fields["participant"],)
+        elif event.name == "Ended":
+            rs.ended = True
+        elif event.name == "Renewed":
+            rs.participants = tuple(fields["participants"])
+            rs.current_index = 0
+            rs.ended = False
+            rs.last_updated_at = fields["renewed_at"]
+            self.cycles[token_id] = fields["cycle"]
+            accounts = fields["participants"]
+
+        after = self.game(token_id)
+        changes = {k: v for k, v in after.items() if before.get(k) != v}
+        deltas = [
+            Delta(
+                game_topic(token_id),
+                {**head, "token_id": token_id, "changes": changes},
+            )
+        ]
+        payload = {**head, "token_id": token_id}
+        if "index" in fields:
+            payload.update(index=fields["index"], amount=fields["amount"])
+        for account in dict.fromkeys(accounts):
+            deltas.append(Delta(account_topic(account), payload))
+        return deltas
+
+    def _transfer(self, event: Event, head: dict) -> list[Delta]:
+        fields = event.fields
+        if event.name == "TransferSingle":
+            moves = [(fields["_id"], fields["_value"])]
+        else:
+            moves = list(zip(fields["_ids"], fields["_values"]))
+        deltas = []
+        for token_id, value in moves:
+            for account, sign in ((fields["_from"], -1), (fields["_to"], 1)):
+                if account == ZERO_ADDRESS:
+                    continue
+                key = (account, token_id)
+                self.balances[key] = self.balances.get(key, 0) + sign * value
+                deltas.append(
+                    Delta(
+                        account_topic(account),
+                        {**head, "token_id": token_id, "balance": self.balances[key]},
+                    )
+                )
+        return deltas
+
+
+# --- Fan-out ---
+
+
+class Hub:
+    """Fans deltas out to subscriber queues by topic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # queue => topics, or None for every topic
+        self._subscribers: dict[queue.Queue, frozenset | None] = {}
+
+    def subscribe(self, topics: Iterable[str] | None = None) -> queue.Queue:
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers[q] = None if topics is None else frozenset(topics)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            self._subscribers.pop(q, None)
+
+    def publish(self, deltas: Iterable[Delta]):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for delta in deltas:
+            for q, topics in subscribers:
+                if topics is None or delta.topic in topics:
+                    q.put(delta)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+# --- Tailing ---
+
+
+class JsonRpc:
+    """Minimal JSON-RPC client over HTTP."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self._id = 0
+
+    def __call__(self, method: str, *params):
+        self._id += 1
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": self._id, "method": method, "params": params}
+        ).encode()
+        request = urllib.request.Request(
+            self.url, body, {"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.load(response)
+        if "error" in reply:
+            raise RuntimeError(f"{method}: {reply['error']}")
+        return reply["result"]
+
+
+class Feed:
+    """Tails `address` through `rpc`, keeps `projection` and publishes to `hub`.
+
+    `rpc(method, *params)` performs one JSON-RPC call, e.g. a `JsonRpc`.
+    """
+
+    def __init__(
+        self,
+        rpc: Callable,
+        address: str,
+        abi: list[dict],
+        start_block: int = 0,
+        confirmations: int = 0,
+    ):
+        self.rpc = rpc
+        self.address = to_checksum_address(address)
+        self.decoder = Decoder(abi)
+        self.projection = Projection()
+        self.hub = Hub()
+        self.next_block = start_block
+        self.confirmations = confirmations
+        # (block, log index) of the last event applied, so that a range
+        # fetched again after a failure does not apply an event twice
+        self.last_applied = (-1, -1)
+        # Serializes `poll` against `subscribe`, so no delta is missed or doubled
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Apply the events of every new block and return how many were applied."""
+        head = int(self.rpc("eth_blockNumber"), 16) - self.confirmations
+        applied = 0
+        while self.next_block <= head:
+            to_block = min(head, self.next_block + BLOCK_RANGE - 1)
+            logs = self.rpc(
+                "eth_getLogs",
+                {
+                    "address": self.address,
+                    "fromBlock": hex(self.next_block),
+                    "toBlock": hex(to_block),
+                    "topics": [self.decoder.topics],
+                },
+            )
+            logs.sort(key=_position)
+            logs = [log for log in logs if _position(log) > self.last_applied]
+            # Every call to the node is made before the first event is
+            # applied, so a failing call leaves the range to be fetched again
+            timestamps = {}
+            for log in logs:
+                block = log["blockNumber"]
+                if block not in timestamps:
+                    timestamps[block] = int(
+                        self.rpc("eth_getBlockByNumber", block, False)["timestamp"], 16
+                    )
+            for log in logs:
+                event = self.decoder.decode(log, timestamps[log["blockNumber"]])
+                if event is not None:
+                    with self._lock:
+                        deltas = self.projection.apply(event)
+                        self.hub.publish(deltas)
+                    applied += 1
+                self.last_applied = _position(log)
+            self.next_block = to_block + 1
+        return applied
+
+    def subscribe(self, games=(), accounts=()) -> tuple[queue.Queue, list[Delta]]:
+        """Subscribe to the given games and accounts, or to everything if both are empty.
+
+        Returns the queue of deltas and a snapshot of each topic, taken at
+        the block from which the queue starts.
+        """
+        topics = [game_topic(int(g)) for g in games]
+        topics += [account_topic(a) for a in accounts]
+        with self._lock:
+            q = self.hub.subscribe(topics or None)
+            snapshots = [
+                Delta(game_topic(int(g)), self.projection.game(int(g))) for g in games
+            ]
+            snapshots += [
+                Delta(account_topic(a), self.projection.account(a)) for a in accounts
+            ]
+        return q, snapshots
+
+    def run(self, stop: threading.Event, interval: float = POLL_INTERVAL):
+        """Poll until `stop` is set.
+
+        A failing poll is logged and retried, waiting twice as long after
+        each consecutive failure up to `MAX_BACKOFF`.
+        """
+        retry = interval or POLL_INTERVAL
+        wait = retry
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception(
+                    "poll from block %d failed, retrying in %.1fs",
+                    self.next_block,
+                    wait,
+                )
+                stop.wait(wait)
+                wait = min(wait * 2, MAX_BACKOFF)
+                continue
+            wait = retry
+            stop.wait(interval)
+
+
+def _position(log: dict) -> tuple[int, int]:
+    return int(log["blockNumber"], 16), int(log["logIndex"], 16)
+
+
+# --- HTTP ---
+
+
+def to_json(value) -> str:
+    """Serialize `value`, with integers as decimal strings."""
+
+    def convert(v):
+        if isinstance(v, bool) or v is None:
+            return v
+        if isinstance(v, int):
+            return str(v)
+        if isinstance(v, bytes):
+            return "0x" + v.hex()
+        if isinstance(v, dict):
+            return {str(k): convert(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [convert(x) for x in v]
+        return v
+
+    return json.dumps(convert(value))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FeedServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        try:
+            if parts == ["stream"]:
+                return self._stream(parse_qs(url.query))
+            if len(parts) == 2 and parts[0] == "games":
+                with self.server.feed._lock:
+                    game = self.server.feed.projection.game(int(parts[1]))
+                if game is None:
+                    return self.send_error(404, "unknown game")
+                return self._send_json(game)
+            if len(parts) == 2 and parts[0] == "accounts":
+                with self.server.feed._lock:
+                    account = self.server.feed.projection.account(parts[1])
+                return self._send_json(account)
+        except ValueError:
+            return self.send_error(400)
+        self.send_error(404)
+
+    def _send_json(self, value):
+        body = to_json(value).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, query: dict):
+        feed = self.server.feed
+        q, snapshots = feed.subscribe(query.get("game", ()), query.get("account", ()))
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            for delta in snapshots:
+                self._send_event("snapshot", delta)
+            while not self.server.stopping.is_set():
+                try:
+                    delta = q.get(timeout=self.server.keepalive)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                self._send_event("delta", delta)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            feed.hub.unsubscribe(q)
+
+    def _send_event(self, kind: str, delta: Delta):
+        data = to_json({"topic": delta.topic, **(delta.payload or {})})
+        self.wfile.write(f"event: {kind}\ndata: {data}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], feed: Feed, keepalive: float = KEEPALIVE
+    ):
+        super().__init__(address, _Handler)
+        self.feed = feed
+        self.keepalive = keepalive
+        self.stopping = threading.Event()
+
+    def shutdown(self):
+        self.stopping.set()
+        super().shutdown()
+
+
+def serve(
+    feed: Feed,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    interval: float = POLL_INTERVAL,
+):
+    """Tail the node and serve the feed until interrupted."""
+    server = FeedServer((host, port), feed)
+    stop = threading.Event()
+    tailer = threading.Thread(target=feed.run, args=(stop, interval), daemon=True)
+    tailer.start()
+    print(f"Serving {feed.address} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.stopping.set()
+        server.server_close()
+
+
+def main(argv: list[str]):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rpc", help="JSON-RPC URL of the node")
+    parser.add_argument("address", help="address of the Pasanaku contract")
+    parser.add_argument("--start-block", type=int, default=0)
+    parser.add_argument("--confirmations", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    feed = Feed(
+        JsonRpc(args.rpc),
+        args.address,
+        pasanaku_abi(),
+        start_block=args.start_block,
+        confirmations=args.confirmations,
+    )
+    serve(feed, args.host, args.port, args.interval)
+
+
+def moccasin_main():
+    from moccasin.config import get_active_network
+
+    from script import mock_erc20s
+    from src import pasanaku as Pasanaku
+
+    logging.basicConfig(level=logging.INFO)
+    network = get_active_network()
+    if not network.url:
+        raise SystemExit("the feed tails a node: run with e.g. `--network anvil`")
+    assets = mock_erc20s.deploy()
+    pasanaku = Pasanaku.deploy(
+        "https://pasanaku.com/api/v1/token/", [a.address for a in assets]
+    )
+    pasanaku.create(assets[0].address, [boa.env.eoa], 0)
+    print(f"Pasanaku: {pasanaku.address}")
+    feed = Feed(JsonRpc(network.url), pasanaku.address, pasanaku.abi)
+    serve(feed)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+"""Merkle trees of participant lists for `Pasanaku.create_committed`.
+
+Builds the same tree as `_participants_root` in `src/pasanaku.vy` and the
+seat proofs taken by `deposit_committed`, `claim_committed` and
+`recover_committed`. `moccasin_main` compares the creation gas of `create`
+and `create_committed` on a local deployment.
+"""
+
+import boa
+from eth_abi import encode
+from eth_utils import keccak
+
+from src import pasanaku as Pasanaku
+from script import mock_erc20s
+
+
+def leaf(seat: int, participant: str) -> bytes:
+    return keccak(keccak(encode(["uint256", "address"], [seat, participant])))
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def levels(participants: list) -> list[list[bytes]]:
+    """Return the nodes of every level, from the leaves up to the root."""
+    if not participants:
+        raise ValueError("no participants")
+    nodes = [leaf(seat, p) for seat, p in enumerate(participants)]
+    ret = [nodes]
+    while len(nodes) > 1:
+        parents = [hash_pair(a, b) for a, b in zip(nodes[::2], nodes[1::2])]
+        if len(nodes) % 2:
+            # The last node of an odd level is carried up unchanged
+            parents.append(nodes[-1])
+        nodes = parents
+        ret.append(nodes)
+    return ret
+
+
+def root(participants: list) -> bytes:
+    return levels(participants)[-1][0]
+
+
+def proof(participants: list, seat: int) -> list[bytes]:
+    """Return the sibling hashes proving that `participants[seat]` holds `seat`."""
+    ret = []
+    index = seat
+    for nodes in levels(participants)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(nodes):
+            ret.append(nodes[sibling])
+        index //= 2
+    return ret
+
+
+def moccasin_main():
+    assets = mock_erc20s.deploy()
+    pasanaku = Pasanaku.deploy(
+        "https://pasanaku.com/api/v1/token/", [a.address for a in assets]
+    )
+    asset = assets[-2]  # USDC, 6 decimals
+    amount = 100 * 10**6
+
+    print(f"{'participants':>12}{'create':>10}{'committed':>11}")
+    for count in (2, 4, 8, 12):
+        players = [boa.env.generate_address() for _ in range(count)]
+        pasanaku.create(asset.address, players, amount)
+        create_gas = pasanaku._computation.get_gas_used()
+        pasanaku.create_committed(asset.address, players, amount)
+        committed_gas = pasanaku._computation.get_gas_used()
+        print(f"{count:>12}{create_gas:>10}{committed_gas:>11}")
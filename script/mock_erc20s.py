@@ -3,34 +3,52 @@ from moccasin.boa_tools import VyperContract
 
 INITIAL_SUPPLY = 1000000000000000000
 
+# Decimals of each mock, in the order `deploy()` returns them
+DECIMALS = {
+    "crvUSD": 18,
+    "scrvUSD": 18,
+    "DAI": 18,
+    "MIM": 18,
+    "PYUSD": 6,
+    "USDS": 18,
+    "sUSDS": 18,
+    "USDC": 6,
+    "USDT0": 6,
+}
+
 
 def deploy() -> list[VyperContract]:
     crvusd: VyperContract = MockERC20.deploy(
-        "Fake crvUSD", "crvUS", 18, INITIAL_SUPPLY, "crvUSD", "1"
+        "Fake crvUSD", "crvUS", DECIMALS["crvUSD"], INITIAL_SUPPLY, "crvUSD", "1"
     )
     scrvusd: VyperContract = MockERC20.deploy(
-        "Fake Savings crvUSD", "scrvU", 18, INITIAL_SUPPLY, "scrvUSD", "1"
+        "Fake Savings crvUSD",
+        "scrvU",
+        DECIMALS["scrvUSD"],
+        INITIAL_SUPPLY,
+        "scrvUSD",
+        "1",
     )
     dai: VyperContract = MockERC20.deploy(
-        "Fake Dai Stablecoin", "DAI", 18, INITIAL_SUPPLY, "DAI", "1"
+        "Fake Dai Stablecoin", "DAI", DECIMALS["DAI"], INITIAL_SUPPLY, "DAI", "1"
     )
     mim: VyperContract = MockERC20.deploy(
-        "Fake Magic Internet Money", "MIM", 18, INITIAL_SUPPLY, "MIM", "1"
+        "Fake Magic Internet Money", "MIM", DECIMALS["MIM"], INITIAL_SUPPLY, "MIM", "1"
     )
     pyusd: VyperContract = MockERC20.deploy(
-        "Fake PayPal USD", "PYUSD", 6, INITIAL_SUPPLY, "PYUSD", "1"
+        "Fake PayPal USD", "PYUSD", DECIMALS["PYUSD"], INITIAL_SUPPLY, "PYUSD", "1"
     )
     usds: VyperContract = MockERC20.deploy(
-        "Fake USDS", "USDS", 18, INITIAL_SUPPLY, "USDS", "1"
+        "Fake USDS", "USDS", DECIMALS["USDS"], INITIAL_SUPPLY, "USDS", "1"
     )
     susds: VyperContract = MockERC20.deploy(
-        "Fake Savings USDS", "sUSDS", 18, INITIAL_SUPPLY, "sUSDS", "1"
+        "Fake Savings USDS", "sUSDS", DECIMALS["sUSDS"], INITIAL_SUPPLY, "sUSDS", "1"
     )
     usdc: VyperContract = MockERC20.deploy(
-        "Fake USD Coin", "USDC", 6, INITIAL_SUPPLY, "USDC", "1"
+        "Fake USD Coin", "USDC", DECIMALS["USDC"], INITIAL_SUPPLY, "USDC", "1"
     )
     usdt0: VyperContract = MockERC20.deploy(
-        "Fake USD\u20ae0", "USDT0", 6, INITIAL_SUPPLY, "USDT0", "1"
+        "Fake USD\u20ae0", "USDT0", DECIMALS["USDT0"], INITIAL_SUPPLY, "USDT0", "1"
     )
 
     print(f"crvUSD:  {crvusd.address}")
@@ -46,5 +64,10 @@ def deploy() -> list[VyperContract]:
     return [crvusd, scrvusd, dai, mim, pyusd, usds, susds, usdc, usdt0]
 
 
+def decimals(assets: list[VyperContract]) -> dict[str, int]:
+    """Return the decimals of the mocks returned by `deploy()`, by address."""
+    return {str(a.address): d for a, d in zip(assets, DECIMALS.values(), strict=True)}
+
+
 def moccasin_main() -> list[VyperContract]:
     return deploy()
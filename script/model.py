@@ -0,0 +1,657 @@
+"""Pure-Python reference model of the `Pasanaku` game state machine.
+
+Mirrors the rules in `src/pasanaku.vy` (`_can_deposit`, `_can_claim`,
+`_can_recover`, their `_committed` counterparts and seat bitmap, round
+advancement, `renew` and `DAYS_30` staleness) so that long random scenarios
+can run without executing EVM bytecode. `tests/test_model.py`
+replays sampled traces against the contract to keep both implementations in sync.
+"""
+
+import random
+import time
+from typing import NamedTuple
+
+# Constants; must match src/pasanaku.vy
+PROTOCOL_FEE = 0
+TOKEN_AMOUNT = 1
+MAX_PARTICIPANTS_COUNT = 12
+DAYS_30 = 60 * 60 * 24 * 30
+ROUND_TIMESTAMP_BITS = 64
+AMOUNT_BITS = 256 - ROUND_TIMESTAMP_BITS - 4
+
+
+def pack_round(amount: int, timestamp: int) -> int:
+    """Return the `round_history` record of a round claimed at `timestamp`."""
+    return amount << ROUND_TIMESTAMP_BITS | timestamp
+
+
+def unpack_round(record: int) -> tuple[int, int]:
+    """Return the `(amount, timestamp)` of a `round_history` record."""
+    return record >> ROUND_TIMESTAMP_BITS, record & (2**ROUND_TIMESTAMP_BITS - 1)
+
+
+class Revert(Exception):
+    """Raised where the contract would revert; `reason` is the `dev:` comment."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class RotatingSavings:
+    """Mirror of the `RotatingSavings` struct; same field order as the contract."""
+
+    __slots__ = (
+        "participants",
+        "asset",
+        "amount",
+        "current_index",
+        "total_deposited",
+        "token_id",
+        "ended",
+        "recovered",
+        "creator",
+        "created_at",
+        "last_updated_at",
+    )
+
+    def __init__(
+        self,
+        participants: tuple,
+        asset: str,
+        amount: int,
+        token_id: int,
+        creator: str,
+        created_at: int,
+    ):
+        self.participants = participants
+        self.asset = asset
+        self.amount = amount
+        self.current_index = 0
+        self.total_deposited = 0
+        self.token_id = token_id
+        self.ended = False
+        self.recovered = False
+        self.creator = creator
+        self.created_at = created_at
+        self.last_updated_at = created_at
+
+    def as_tuple(self) -> tuple:
+        """Return the struct as `rotating_savings(token_id)` would."""
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+
+class Pasanaku:
+    """In-memory `Pasanaku` contract; ERC-20 transfers are assumed to succeed."""
+
+    __slots__ = (
+        "supported_assets",
+        "games",
+        "deposited",
+        "balances",
+        "total_supply",
+        "counter",
+        "cycles",
+        "liabilities",
+        "rounds",
+        "commitments",
+        "seats",
+    )
+
+    def __init__(self, supported_assets):
+        self.supported_assets = frozenset(supported_assets)
+        self.games: dict[int, RotatingSavings] = {}
+        # (participant, token_id, round) for every `_deposited` flag set to True
+        self.deposited: set[tuple[str, int, int]] = set()
+        # (owner, token_id) => ERC-1155 balance
+        self.balances: dict[tuple[str, int], int] = {}
+        self.total_supply: dict[int, int] = {}
+        self.counter = 0
+        # token_id => number of renewals, absent until the first one
+        self.cycles: dict[int, int] = {}
+        # asset => funds held for open rounds
+        self.liabilities: dict[str, int] = {}
+        # (token_id, index) => packed record of the last claim of the round
+        self.rounds: dict[tuple[int, int], int] = {}
+        # token_id => participant list of a game created by `create_committed`,
+        # which stands in for its Merkle root
+        self.commitments: dict[int, tuple] = {}
+        # (token_id, index) => bitmap of the seats that deposited in the round
+        self.seats: dict[tuple[int, int], int] = {}
+
+    # --- State-changing entry points ---
+
+    def create(
+        self,
+        sender: str,
+        asset: str,
+        participants,
+        amount: int,
+        timestamp: int,
+        value: int = PROTOCOL_FEE,
+    ) -> int:
+        """Create a game and return its token ID."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        self._check_create(asset, participants, amount)
+        return self._create(sender, asset, participants, amount, timestamp)
+
+    def create_many(
+        self,
+        sender: str,
+        specs,
+        timestamp: int,
+        value: int = PROTOCOL_FEE,
+    ) -> list[int]:
+        """Create a game per `(asset, participants, amount)` spec and return their token IDs."""
+        if value < PROTOCOL_FEE * len(specs):
+            raise Revert("insufficient fee")
+        if len(specs) == 0:
+            raise Revert("no games")
+        # The contract reverts as a whole, so every spec is checked first
+        for asset, participants, amount in specs:
+            self._check_create(asset, participants, amount)
+        return [self._create(sender, *spec, timestamp) for spec in specs]
+
+    def create_committed(
+        self,
+        sender: str,
+        asset: str,
+        participants,
+        amount: int,
+        timestamp: int,
+        value: int = PROTOCOL_FEE,
+    ) -> int:
+        """Create a game that only commits to its participant list and return its token ID."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        if asset not in self.supported_assets:
+            raise Revert("unsupported asset")
+        if len(participants) == 0:
+            raise Revert("no participants")
+        if amount >> AMOUNT_BITS:
+            raise Revert("amount too large")
+        if len(participants) > MAX_PARTICIPANTS_COUNT:
+            raise Revert("too many participants")
+        if any(int(p, 16) == 0 for p in participants):
+            raise Revert("zero address participant")
+
+        # No tokens are minted and the stored participant list stays empty
+        token_id = self.counter
+        self.counter += 1
+        self.total_supply[token_id] = 0
+        self.commitments[token_id] = tuple(participants)
+        self.games[token_id] = RotatingSavings(
+            (), asset, amount, token_id, sender, timestamp
+        )
+        return token_id
+
+    def _check_create(self, asset: str, participants, amount: int):
+        if asset not in self.supported_assets:
+            raise Revert("unsupported asset")
+        if len(participants) == 0:
+            raise Revert("no participants")
+        if len(participants) > MAX_PARTICIPANTS_COUNT:
+            raise Revert("too many participants")
+        if amount >> AMOUNT_BITS:
+            raise Revert("amount too large")
+        if any(int(p, 16) == 0 for p in participants):
+            raise Revert("mint to the zero address")
+
+    def _create(
+        self, sender: str, asset: str, participants, amount: int, timestamp: int
+    ) -> int:
+        token_id = self.counter
+        self.counter += 1
+        for participant in participants:
+            key = (participant, token_id)
+            self.balances[key] = self.balances.get(key, 0) + TOKEN_AMOUNT
+        self.total_supply[token_id] = len(participants) * TOKEN_AMOUNT
+        self.games[token_id] = RotatingSavings(
+            tuple(participants), asset, amount, token_id, sender, timestamp
+        )
+        return token_id
+
+    def deposit(
+        self, sender: str, token_id: int, timestamp: int, value: int = PROTOCOL_FEE
+    ) -> int:
+        """Deposit into the current round and return the amount pulled from `sender`."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        if not self.can_deposit(sender, token_id, timestamp):
+            raise Revert("cannot deposit")
+
+        rs = self.games[token_id]
+        rs.last_updated_at = timestamp
+        rs.total_deposited += rs.amount
+        self.deposited.add((sender, token_id, self._round(token_id, rs.current_index)))
+        self._add_liability(rs.asset, rs.amount)
+        return rs.amount
+
+    def claim(
+        self, sender: str, token_id: int, timestamp: int, value: int = PROTOCOL_FEE
+    ) -> int:
+        """Claim the current pot and return the amount paid to `sender`."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        if not self.can_claim(sender, token_id, timestamp):
+            raise Revert("cannot claim")
+
+        rs = self.games[token_id]
+        total_deposited = rs.total_deposited
+        rs.last_updated_at = timestamp
+        rs.current_index += 1
+        rs.total_deposited = 0
+        rs.ended = rs.current_index == len(rs.participants)
+        self._add_liability(rs.asset, -total_deposited)
+        self.rounds[(token_id, rs.current_index - 1)] = pack_round(
+            total_deposited, timestamp
+        )
+        return total_deposited
+
+    def recover(self, sender: str, token_id: int, timestamp: int) -> int:
+        """Recover a stale deposit and return the amount paid back to `sender`."""
+        if not self.can_recover(sender, token_id, timestamp):
+            raise Revert("cannot recover")
+
+        key = (sender, token_id)
+        if self.balances.get(key, 0) < TOKEN_AMOUNT:
+            raise Revert("burn amount exceeds balance")
+        self.balances[key] -= TOKEN_AMOUNT
+        self.total_supply[token_id] -= TOKEN_AMOUNT
+
+        rs = self.games[token_id]
+        rs.total_deposited -= rs.amount
+        rs.recovered = True
+        self.deposited.discard(
+            (sender, token_id, self._round(token_id, rs.current_index))
+        )
+        self._add_liability(rs.asset, -rs.amount)
+        return rs.amount
+
+    def transfer(self, sender: str, token_id: int, to: str, amount: int) -> int:
+        """Transfer seat tokens as `safeTransferFrom` and return the balance of `to`.
+
+        A seat stays with its participant in `participants`; only the token moves,
+        so the new holder cannot act for it and the old one can no longer recover.
+        """
+        if int(to, 16) == 0:
+            raise Revert("transfer to the zero address")
+        if self.balance_of(sender, token_id) < amount:
+            raise Revert("insufficient balance for transfer")
+        self.balances[(sender, token_id)] = self.balance_of(sender, token_id) - amount
+        self.balances[(to, token_id)] = self.balance_of(to, token_id) + amount
+        return self.balance_of(to, token_id)
+
+    def deposit_committed(
+        self,
+        sender: str,
+        token_id: int,
+        seat: int,
+        timestamp: int,
+        value: int = PROTOCOL_FEE,
+    ) -> int:
+        """Deposit for `seat` of a committed game and return the amount pulled from `sender`."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        if not self.can_deposit_committed(sender, token_id, seat, timestamp):
+            raise Revert("cannot deposit")
+
+        rs = self.games[token_id]
+        rs.last_updated_at = timestamp
+        rs.total_deposited += rs.amount
+        key = (token_id, rs.current_index)
+        self.seats[key] = self.seats.get(key, 0) | 1 << seat
+        self._add_liability(rs.asset, rs.amount)
+        return rs.amount
+
+    def claim_committed(
+        self, sender: str, token_id: int, timestamp: int, value: int = PROTOCOL_FEE
+    ) -> int:
+        """Claim the current pot of a committed game and return the amount paid to `sender`."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        if not self.can_claim_committed(sender, token_id, timestamp):
+            raise Revert("cannot claim")
+
+        rs = self.games[token_id]
+        total_deposited = rs.total_deposited
+        rs.last_updated_at = timestamp
+        rs.current_index += 1
+        rs.total_deposited = 0
+        rs.ended = rs.current_index == len(self.commitments[token_id])
+        self._add_liability(rs.asset, -total_deposited)
+        self.rounds[(token_id, rs.current_index - 1)] = pack_round(
+            total_deposited, timestamp
+        )
+        return total_deposited
+
+    def recover_committed(
+        self, sender: str, token_id: int, seat: int, timestamp: int
+    ) -> int:
+        """Recover the stale deposit of `seat` and return the amount paid back to `sender`."""
+        if not self.can_recover_committed(sender, token_id, seat, timestamp):
+            raise Revert("cannot recover")
+
+        rs = self.games[token_id]
+        rs.total_deposited -= rs.amount
+        rs.recovered = True
+        self.seats[(token_id, rs.current_index)] &= ~(1 << seat)
+        self._add_liability(rs.asset, -rs.amount)
+        return rs.amount
+
+    def renew(
+        self,
+        sender: str,
+        token_id: int,
+        order: tuple,
+        timestamp: int,
+        value: int = PROTOCOL_FEE,
+    ) -> int:
+        """Start a new cycle of an ended game and return its cycle number."""
+        if value < PROTOCOL_FEE:
+            raise Revert("insufficient fee")
+        rs = self.games.get(token_id)
+        if rs is None or not rs.ended:
+            raise Revert("cannot renew")
+        if sender != rs.creator:
+            raise Revert("not creator")
+        if not rs.participants:
+            raise Revert("cannot renew")
+        if order:
+            if sorted(order) != list(range(len(rs.participants))):
+                raise Revert("invalid order")
+            rs.participants = tuple(rs.participants[seat] for seat in order)
+
+        rs.current_index = 0
+        rs.ended = False
+        rs.last_updated_at = timestamp
+        self.cycles[token_id] = self.cycles.get(token_id, 0) + 1
+        return self.cycles[token_id]
+
+    def _add_liability(self, asset: str, amount: int):
+        self.liabilities[asset] = self.liabilities.get(asset, 0) + amount
+
+    def _round(self, token_id: int, index: int) -> int:
+        return self.cycles.get(token_id, 0) * MAX_PARTICIPANTS_COUNT + index
+
+    # --- Views ---
+
+    def can_deposit(self, participant: str, token_id: int, timestamp: int) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended or not self.total_supply.get(token_id):
+            return False
+        return (
+            participant in rs.participants
+            and participant != rs.participants[rs.current_index]
+            and not rs.recovered
+            and not self.has_deposited(participant, token_id, rs.current_index)
+        )
+
+    def can_claim(self, participant: str, token_id: int, timestamp: int) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended or not self.total_supply.get(token_id):
+            return False
+        if participant not in rs.participants:
+            return False
+        deposits_count = rs.participants.count(participant)
+        min_amount_to_claim = rs.amount * (len(rs.participants) - deposits_count)
+        return (
+            participant == rs.participants[rs.current_index]
+            and not rs.recovered
+            and rs.total_deposited >= min_amount_to_claim
+        )
+
+    def can_recover(self, participant: str, token_id: int, timestamp: int) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended or not self.total_supply.get(token_id):
+            return False
+        return (
+            participant in rs.participants
+            and participant != rs.participants[rs.current_index]
+            and rs.total_deposited > 0
+            and self.has_deposited(participant, token_id, rs.current_index)
+            and timestamp - rs.last_updated_at >= DAYS_30
+        )
+
+    def can_deposit_committed(
+        self, participant: str, token_id: int, seat: int, timestamp: int
+    ) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended or rs.recovered:
+            return False
+        return (
+            seat != rs.current_index
+            and not self.deposited_seats(token_id, rs.current_index) & 1 << seat
+            and self.holds_seat(participant, token_id, seat)
+        )
+
+    def can_claim_committed(
+        self, participant: str, token_id: int, timestamp: int
+    ) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended or rs.recovered:
+            return False
+        count = len(self.commitments.get(token_id, ()))
+        return (
+            count != 0
+            and rs.total_deposited >= rs.amount * (count - 1)
+            and self.holds_seat(participant, token_id, rs.current_index)
+        )
+
+    def can_recover_committed(
+        self, participant: str, token_id: int, seat: int, timestamp: int
+    ) -> bool:
+        rs = self.games.get(token_id)
+        if rs is None or rs.ended:
+            return False
+        return (
+            seat != rs.current_index
+            and rs.total_deposited > 0
+            and self.deposited_seats(token_id, rs.current_index) & 1 << seat != 0
+            and timestamp - rs.last_updated_at >= DAYS_30
+            and self.holds_seat(participant, token_id, seat)
+        )
+
+    def holds_seat(self, participant: str, token_id: int, seat: int) -> bool:
+        """Return whether a valid proof of `seat` exists for `participant`, as `_verify_seat`."""
+        participants = self.commitments.get(token_id, ())
+        return seat < len(participants) and participants[seat] == participant
+
+    def deposited_seats(self, token_id: int, index: int) -> int:
+        return self.seats.get((token_id, index), 0)
+
+    def has_deposited(self, account: str, token_id: int, index: int) -> bool:
+        return (account, token_id, self._round(token_id, index)) in self.deposited
+
+    def round_history(self, token_id: int) -> list[int]:
+        rs = self.games.get(token_id)
+        if rs is None:
+            return []
+        return [self.rounds[(token_id, i)] for i in range(rs.current_index)]
+
+    def asset_liabilities(self, asset: str) -> int:
+        return self.liabilities.get(asset, 0)
+
+    def balance_of(self, owner: str, token_id: int) -> int:
+        return self.balances.get((owner, token_id), 0)
+
+
+class Step(NamedTuple):
+    """One action of a trace and the outcome the model produced for it.
+
+    `action` is one of `create`, `deposit`, `claim`, `recover`, `renew`,
+    `transfer`, `warp` or the `_committed` variant of `create`, `deposit`, `claim` and `recover`;
+    `reverted` holds the revert reason, or `None` if the action succeeded.
+    """
+
+    action: str
+    sender: str | None
+    args: tuple
+    timestamp: int
+    result: int | None
+    reverted: str | None
+
+
+def apply(model: Pasanaku, action: str, sender, args: tuple, timestamp: int) -> Step:
+    """Apply one action to `model` and record its outcome."""
+    result = None
+    reverted = None
+    try:
+        if action == "create":
+            result = model.create(sender, *args, timestamp)
+        elif action == "deposit":
+            result = model.deposit(sender, *args, timestamp)
+        elif action == "claim":
+            result = model.claim(sender, *args, timestamp)
+        elif action == "recover":
+            result = model.recover(sender, *args, timestamp)
+        elif action == "renew":
+            result = model.renew(sender, *args, timestamp)
+        elif action == "transfer":
+            result = model.transfer(sender, *args)
+        elif action == "create_committed":
+            result = model.create_committed(sender, *args, timestamp)
+        elif action == "deposit_committed":
+            result = model.deposit_committed(sender, *args, timestamp)
+        elif action == "claim_committed":
+            result = model.claim_committed(sender, *args, timestamp)
+        elif action == "recover_committed":
+            result = model.recover_committed(sender, *args, timestamp)
+        elif action != "warp":
+            raise ValueError(f"unknown action {action!r}")
+    except Revert as e:
+        reverted = e.reason
+    return Step(action, sender, args, timestamp, result, reverted)
+
+
+def random_trace(
+    rng: random.Random,
+    model: Pasanaku,
+    accounts: list,
+    assets: list,
+    steps: int,
+    timestamp: int = 0,
+    max_amount: int = 10**6,
+):
+    """Yield `steps` random actions applied to `model`.
+
+    Actions are biased towards game participants and open games so that most
+    rounds advance, while still exercising the reverting paths.
+    """
+    for _ in range(steps):
+        roll = rng.random()
+        if roll < 0.03 or not model.games:
+            if rng.random() < 0.2:
+                # Duplicate participants are allowed but tend to stall a game
+                count = rng.randint(1, MAX_PARTICIPANTS_COUNT)
+                participants = tuple(rng.choices(accounts, k=count))
+            else:
+                count = rng.randint(1, min(MAX_PARTICIPANTS_COUNT, len(accounts)))
+                participants = tuple(rng.sample(accounts, count))
+            asset = rng.choice(assets)
+            amount = rng.randint(0, max_amount)
+            args = (asset, participants, amount)
+            action = "create_committed" if rng.random() < 0.3 else "create"
+            yield apply(model, action, rng.choice(accounts), args, timestamp)
+            continue
+        if roll < 0.06:
+            timestamp += rng.choice((1, 60 * 60, DAYS_30 - 1, DAYS_30))
+            yield apply(model, "warp", None, (), timestamp)
+            continue
+
+        # Mostly target the latest games, with one token ID that does not exist yet
+        token_id = rng.randrange(max(0, model.counter - 4), model.counter + 1)
+        rs = model.games.get(token_id)
+        if rs is not None and rs.ended and rng.random() < 0.5:
+            # Recurring groups renew, sometimes in a new order
+            order = ()
+            if rng.random() < 0.5:
+                order = tuple(
+                    rng.sample(range(len(rs.participants)), len(rs.participants))
+                )
+            sender = rs.creator if rng.random() < 0.9 else rng.choice(accounts)
+            yield apply(model, "renew", sender, (token_id, order), timestamp)
+            continue
+        if rng.random() < 0.04:
+            # Seat tokens change hands, rarely to the zero address
+            holders = (
+                rs.participants if rs is not None and rs.participants else accounts
+            )
+            sender = rng.choice(holders)
+            to = rng.choice(accounts) if rng.random() < 0.95 else "0x" + "00" * 20
+            amount = TOKEN_AMOUNT if rng.random() < 0.9 else 2 * TOKEN_AMOUNT
+            yield apply(model, "transfer", sender, (token_id, to, amount), timestamp)
+            continue
+        committed = model.commitments.get(token_id)
+        if committed is not None:
+            yield _committed_step(rng, model, accounts, token_id, timestamp)
+            continue
+        if rs is None or rs.ended or rng.random() < 0.05:
+            action = rng.choice(("deposit", "claim", "recover"))
+            yield apply(model, action, rng.choice(accounts), (token_id,), timestamp)
+            continue
+
+        beneficiary = rs.participants[rs.current_index]
+        if rng.random() < 0.2:
+            action = rng.choices(("deposit", "claim", "recover"), weights=(2, 2, 1))[0]
+            sender = rng.choice(rs.participants)
+        else:
+            # Walk the round forward: pending deposits first, then the claim
+            pending = [
+                p for p in rs.participants if model.can_deposit(p, token_id, timestamp)
+            ]
+            if pending:
+                action, sender = "deposit", rng.choice(pending)
+            else:
+                action, sender = "claim", beneficiary
+        yield apply(model, action, sender, (token_id,), timestamp)
+
+
+def _committed_step(
+    rng: random.Random, model: Pasanaku, accounts: list, token_id: int, timestamp: int
+) -> Step:
+    """Return a random action on the committed game `token_id` applied to `model`."""
+    rs = model.games[token_id]
+    participants = model.commitments[token_id]
+    if rs.ended or rng.random() < 0.2:
+        # Any seat, including one past the end, from any participant or account
+        action = rng.choices(
+            ("deposit_committed", "claim_committed", "recover_committed"),
+            weights=(2, 2, 1),
+        )[0]
+        sender = rng.choice(participants if rng.random() < 0.8 else accounts)
+        seat = rng.randrange(len(participants) + 1)
+    else:
+        pending = [
+            seat
+            for seat, p in enumerate(participants)
+            if model.can_deposit_committed(p, token_id, seat, timestamp)
+        ]
+        if pending:
+            action, seat = "deposit_committed", rng.choice(pending)
+        else:
+            action, seat = "claim_committed", rs.current_index
+        sender = participants[seat]
+    args = (token_id,) if action == "claim_committed" else (token_id, seat)
+    return apply(model, action, sender, args, timestamp)
+
+
+def moccasin_main():
+    rng = random.Random(0)
+    accounts = [f"0x{i:040x}" for i in range(1, 17)]
+    assets = [f"0x{i:040x}" for i in range(0x100, 0x100 + 9)]
+    model = Pasanaku(assets)
+    steps = 1_000_000
+
+    start = time.perf_counter()
+    reverted = sum(
+        s.reverted is not None
+        for s in random_trace(rng, model, accounts, assets, steps)
+    )
+    elapsed = time.perf_counter() - start
+
+    ended = sum(rs.ended for rs in model.games.values())
+    print(f"steps:    {steps} ({steps / elapsed:,.0f}/s)")
+    print(f"reverted: {reverted}")
+    print(f"games:    {model.counter} ({ended} ended)")
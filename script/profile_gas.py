@@ -0,0 +1,382 @@
+"""Gas attribution profiler for `Pasanaku` built on boa.
+
+Runs the tests (or any script) with profiling enabled and, for every entry
+point called, attributes gas to source lines of `src/pasanaku.vy` and the
+snekmate modules it uses, and lists every SLOAD/SSTORE by slot with its
+cold/warm status. The report is exported as sorted JSON, so two runs can be
+diffed, and as collapsed stacks for flamegraph tools.
+
+Line gas is what boa measured. boa does not reset access lists between
+calls, so storage accesses are classified and priced as if every call were a
+separate transaction.
+
+    mox run profile_gas
+    python -m script.profile_gas tests/test_pasanaku.py -k claim
+    python -m script.profile_gas --script script/compact.py
+"""
+
+import argparse
+import json
+import os
+import runpy
+import statistics
+import sys
+from contextlib import contextmanager
+
+import boa
+from boa.contracts.vyper.ast_utils import get_fn_name_from_lineno
+from boa.contracts.vyper.vyper_contract import VyperContract
+from boa.environment import Env
+from boa.vm.gas_meters import ProfilingGasMeter
+from boa.vm import py_evm
+
+SLOAD = 0x54
+SSTORE = 0x55
+
+# EIP-2929 extra cost of a cold over a warm storage access
+COLD_SURCHARGE = {SLOAD: 2_000, SSTORE: 2_100}
+
+OUT_DIR = "out"
+JSON_REPORT = "gas_profile.json"
+COLLAPSED_REPORT = "gas_profile.folded"
+
+# The profiler collecting data, if any
+_active = None
+
+
+def _storage_hook(profiler, opcode: int, mnemonic: str, original=None):
+    """Wrap the handler of `opcode` to log accesses to `profiler`.
+
+    `original` is an override installed before the profiler's, if any.
+    """
+
+    def handler(computation):
+        if original is not None:
+            return original(computation)
+        return type(computation).opcodes[opcode](computation)
+
+    def hook(computation):
+        slot = _to_int(computation._stack.values[-1])
+        address = computation.msg.storage_address
+        # boa keeps slots warm across calls, so warmth is tracked per call
+        # as if each call were its own transaction, and gas is repriced
+        warm = (address, slot) in profiler._touched
+        profiler._touched.add((address, slot))
+        surcharge = 0
+        if not warm and computation.state.is_storage_warm(address, slot):
+            surcharge = COLD_SURCHARGE[opcode]
+        gas_before = computation.get_gas_remaining()
+        handler(computation)
+        profiler._accesses.append(
+            (
+                mnemonic,
+                address,
+                computation.code.program_counter - 1,
+                slot,
+                warm,
+                gas_before - computation.get_gas_remaining() + surcharge,
+            )
+        )
+
+    hook.mnemonic = mnemonic
+    return hook
+
+
+def _relpath(path: str) -> str:
+    path = str(path)
+    # Collapse dependency install locations to the module's import path
+    marker = f"{os.sep}snekmate{os.sep}"
+    if marker in path:
+        return "snekmate/" + path.split(marker, 1)[1]
+    return os.path.relpath(path)
+
+
+def _to_int(value) -> int:
+    return value if isinstance(value, int) else int.from_bytes(value, "big")
+
+
+def _key_name(key: int) -> str:
+    # Accounts differ between runs, so they are elided to keep reports diffable
+    if key < 2**64:
+        return str(key)
+    return "<address>" if key < 2**160 else "<bytes32>"
+
+
+class Profiler:
+    """Collects per-entry-point line gas and storage accesses while active.
+
+    Use as a context manager around any code that calls contracts through
+    `boa.env`; `report()` and `collapsed_stacks()` return the results.
+    """
+
+    def __init__(self):
+        self._accesses = []
+        self._touched = set()
+        # entry point => {"gas": [...], "lines": {...}, "storage": {...}}
+        self.entry_points: dict[str, dict] = {}
+        # (address, slot) => variable name, from the storage layouts
+        self._slot_names: dict[tuple[bytes, int], str] = {}
+        self._layouts_seen: set[bytes] = set()
+
+    # --- Collection ---
+
+    @contextmanager
+    def _patched(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("a profiler is already active")
+        execute_code = Env.execute_code
+        profiler = self
+
+        def profiled_execute_code(env, *args, **kwargs):
+            profiler._accesses = []
+            profiler._touched = set()
+            computation = execute_code(env, *args, **kwargs)
+            profiler._record(env, computation)
+            return computation
+
+        # Computations pick up opcode overrides when they are created, so the
+        # overrides are only installed while profiling and restored after
+        overrides = py_evm._opcode_overrides
+        originals = {opcode: overrides.get(opcode) for opcode in COLD_SURCHARGE}
+        for opcode, mnemonic in ((SLOAD, "SLOAD"), (SSTORE, "SSTORE")):
+            py_evm.patch_opcode(
+                opcode, _storage_hook(self, opcode, mnemonic, originals[opcode])
+            )
+        Env.execute_code = profiled_execute_code
+        _active = self
+        try:
+            yield
+        finally:
+            _active = None
+            Env.execute_code = execute_code
+            for opcode, original in originals.items():
+                if original is None:
+                    overrides.pop(opcode, None)
+                else:
+                    py_evm.patch_opcode(opcode, original)
+
+    def __enter__(self):
+        self._context = self._patched()
+        self._context.__enter__()
+        self._gas_meter_class = boa.env.get_gas_meter_class()
+        boa.env.set_gas_meter_class(ProfilingGasMeter)
+        return self
+
+    def __exit__(self, *exc):
+        boa.env.set_gas_meter_class(self._gas_meter_class)
+        return self._context.__exit__(*exc)
+
+    def _record(self, env, computation):
+        contract = env.lookup_contract(computation.msg.code_address)
+        if not isinstance(contract, VyperContract):
+            return
+        if not isinstance(computation._gas_meter, ProfilingGasMeter):
+            return
+
+        fn = contract._get_fn_from_computation(computation)
+        name = (
+            f"{contract.contract_name}.{fn.name if fn is not None else '__default__'}"
+        )
+        entry = self.entry_points.setdefault(
+            name, {"gas": [], "lines": {}, "storage": {}}
+        )
+        entry["gas"].append(computation.get_gas_used())
+
+        pc_lines = {}
+        self._attribute_lines(
+            env, contract, computation, name, entry["lines"], pc_lines
+        )
+        for mnemonic, address, pc, slot, warm, gas in self._accesses:
+            line = pc_lines.get((address, pc), "<unknown>")
+            key = (mnemonic, self._slot_name(env, address, slot), line)
+            stats = entry["storage"].setdefault(key, {"cold": 0, "warm": 0, "gas": 0})
+            stats["warm" if warm else "cold"] += 1
+            stats["gas"] += gas
+
+    def _attribute_lines(self, env, contract, computation, stack, lines, pc_lines):
+        """Add the gas of `computation` and its children to `lines`, keyed by stack."""
+        gas_of = dict(computation._gas_meter._gas_used_of)
+        for pc, child in zip(computation._child_pcs, computation.children):
+            gas_of[pc] = gas_of.get(pc, 0) - child.get_gas_used()
+
+        self._learn_slot_names(contract)
+        source_map = contract.source_map["pc_raw_ast_map"]
+        node = None
+        seen = set()
+        for pc in computation.code._trace:
+            if (new_node := source_map.get(pc)) is not None:
+                node = new_node
+            if pc in seen:
+                continue
+            seen.add(pc)
+            if node is None:
+                frame = f"{contract.contract_name}:<dispatch>"
+            else:
+                path = node.module_node.resolved_path
+                fn_name = get_fn_name_from_lineno(source_map, path, node.lineno)
+                source = node.full_source_code.splitlines()[node.lineno - 1].strip()
+                # `;` separates frames in the collapsed stack format
+                source = source.replace(";", ",")
+                frame = f"{_relpath(path)}:{fn_name};{_relpath(path)}:{node.lineno} {source}"
+            pc_lines[(computation.msg.storage_address, pc)] = frame
+            key = f"{stack};{frame}"
+            lines[key] = lines.get(key, 0) + gas_of.get(pc, 0)
+
+        for pc, child in zip(computation._child_pcs, computation.children):
+            child_contract = env.lookup_contract(child.msg.code_address)
+            caller = pc_lines.get((computation.msg.storage_address, pc), "<call>")
+            child_stack = f"{stack};{caller};{getattr(child_contract, 'contract_name', '<extcall>')}"
+            if isinstance(child_contract, VyperContract):
+                self._attribute_lines(
+                    env, child_contract, child, child_stack, lines, pc_lines
+                )
+            else:
+                lines[child_stack] = lines.get(child_stack, 0) + child.get_gas_used()
+
+    # --- Storage slot names ---
+
+    def _learn_slot_names(self, contract):
+        address = contract.address.canonical_address
+        if address in self._layouts_seen:
+            return
+        self._layouts_seen.add(address)
+
+        def walk(layout, prefix):
+            for name, item in layout.items():
+                if "slot" in item:
+                    self._slot_names[(address, item["slot"])] = prefix + name
+                else:
+                    walk(item, f"{prefix}{name}.")
+
+        walk(contract.compiler_data.storage_layout["storage_layout"], "")
+
+    def _slot_name(self, env, address: bytes, slot: int, depth: int = 0) -> str:
+        """Name `slot` as `variable[key]...+offset` from the layout and SHA3 preimages."""
+        if depth > 4:
+            return hex(slot)
+        for offset in range(0, 64):
+            base = slot - offset
+            suffix = f"+{offset}" if offset else ""
+            if (address, base) in self._slot_names:
+                return self._slot_names[(address, base)] + suffix
+            preimage = (
+                env.sha3_trace.get(base.to_bytes(32, "big")) if base >= 0 else None
+            )
+            if preimage is not None:
+                # Vyper hashes `slot ++ key` for `HashMap` entries
+                parent = _to_int(preimage[:32])
+                key = _key_name(_to_int(preimage[32:]))
+                return (
+                    f"{self._slot_name(env, address, parent, depth + 1)}[{key}]{suffix}"
+                )
+        return hex(slot)
+
+    # --- Reports ---
+
+    def report(self) -> dict:
+        """Return a JSON-serialisable report with deterministic ordering."""
+        ret = {}
+        for name, entry in sorted(self.entry_points.items()):
+            gas = entry["gas"]
+            lines = sorted(entry["lines"].items(), key=lambda x: (-x[1], x[0]))
+            storage = sorted(
+                entry["storage"].items(), key=lambda x: (-x[1]["gas"], x[0])
+            )
+            ret[name] = {
+                "calls": len(gas),
+                "gas": {
+                    "mean": int(statistics.mean(gas)),
+                    "median": int(statistics.median(gas)),
+                    "min": min(gas),
+                    "max": max(gas),
+                },
+                "lines": [
+                    {"stack": stack, "gas": total // len(gas)}
+                    for stack, total in lines
+                    if total
+                ],
+                "storage": [
+                    {
+                        "op": op,
+                        "slot": slot,
+                        "line": line,
+                        "cold": stats["cold"],
+                        "warm": stats["warm"],
+                        "gas": stats["gas"] // len(gas),
+                    }
+                    for (op, slot, line), stats in storage
+                ],
+            }
+        return ret
+
+    def collapsed_stacks(self) -> list[str]:
+        """Return `frame;frame;... gas` lines, averaged per call, for flamegraph tools."""
+        out = []
+        for name, entry in sorted(self.entry_points.items()):
+            calls = len(entry["gas"])
+            for stack, total in sorted(entry["lines"].items()):
+                if total > 0:
+                    out.append(f"{stack} {total // calls}")
+        return out
+
+    def write(self, out_dir: str = OUT_DIR) -> tuple[str, str]:
+        os.makedirs(out_dir, exist_ok=True)
+        json_path = os.path.join(out_dir, JSON_REPORT)
+        collapsed_path = os.path.join(out_dir, COLLAPSED_REPORT)
+        with open(json_path, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
+            f.write("\n")
+        with open(collapsed_path, "w") as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+        return json_path, collapsed_path
+
+
+def profile_pytest(args: list[str]) -> Profiler:
+    import pytest
+
+    profiler = Profiler()
+    with profiler:
+        pytest.main(["-q", "-p", "no:cacheprovider", *args])
+    return profiler
+
+
+def profile_script(path: str) -> Profiler:
+    profiler = Profiler()
+    with profiler:
+        module = runpy.run_path(path, run_name="__profile__")
+        if callable(module.get("moccasin_main")):
+            module["moccasin_main"]()
+    return profiler
+
+
+def print_summary(profiler: Profiler):
+    for name, entry in profiler.report().items():
+        print(f"{name}: {entry['calls']} calls, median {entry['gas']['median']} gas")
+        for line in entry["lines"][:5]:
+            print(f"    {line['gas']:>8}  {line['stack'].rsplit(';', 1)[-1]}")
+
+
+def main(argv: list[str]) -> Profiler:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", help="profile a script instead of the tests")
+    parser.add_argument("--out", default=OUT_DIR, help="report directory")
+    args, pytest_args = parser.parse_known_args(argv)
+
+    if args.script:
+        profiler = profile_script(args.script)
+    else:
+        profiler = profile_pytest(pytest_args or ["tests/test_pasanaku.py"])
+
+    print_summary(profiler)
+    for path in profiler.write(args.out):
+        print(f"wrote {path}")
+    return profiler
+
+
+def moccasin_main():
+    return main([])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
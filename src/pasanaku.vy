@@ -99,6 +99,25 @@ event Recovered:
     amount: uint256
 
 
+# @dev The `Renewed` event is emitted when an ended rotating
+# savings game starts a new cycle. Rounds, deposits and claims
+# logged after it belong to the new cycle.
+event Renewed:
+    token_id: indexed(uint256)
+    cycle: uint256
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT]
+    renewed_at: uint256
+
+
+# @dev The `ParticipantsCommitted` event is emitted when a game
+# is created with a Merkle-committed participant list. The
+# list itself is logged in `RotatingSavingsCreated`.
+event ParticipantsCommitted:
+    token_id: indexed(uint256)
+    root: bytes32
+    count: uint256
+
+
 # @dev The protocol fee is the amount of ETH required to create,
 # deposit, and claim from a rotating savings game.
 PROTOCOL_FEE: constant(uint256) = as_wei_value(0, "ether")
@@ -118,6 +137,11 @@ MAX_PARTICIPANTS_COUNT: constant(uint256) = 12
 DAYS_30: constant(uint256) = 60 * 60 * 24 * 30
 
 
+# @dev The maximum number of games created by one `create_many` call,
+# sized so that a batch of full games fits in a 30M gas block.
+MAX_CREATE_MANY_COUNT: constant(uint256) = 32
+
+
 # @dev The number of supported assets.
 SUPPORTED_ASSETS_COUNT: constant(uint256) = 9
 
@@ -127,6 +151,24 @@ SUPPORTED_ASSETS_COUNT: constant(uint256) = 9
 SUPPORTED_ASSETS: immutable(address[SUPPORTED_ASSETS_COUNT])
 
 
+# @dev The opcodes of the compact calldata format decoded by `__default__`.
+# Every compact call starts with one of these bytes, so none of them may be
+# the first byte of an external function selector.
+COMPACT_DEPOSIT: constant(uint256) = 2
+COMPACT_CLAIM: constant(uint256) = 3
+COMPACT_CREATE: constant(uint256) = 4
+
+
+# @dev The byte length of a compact `deposit` or `claim` call:
+# opcode (1) and token ID (4).
+COMPACT_ROUND_CALL_SIZE: constant(uint256) = 5
+
+
+# @dev The byte length of the compact `create` header: opcode (1),
+# asset index (1), amount exponent (1) and amount mantissa (8).
+COMPACT_CREATE_HEADER_SIZE: constant(uint256) = 11
+
+
 # @dev The `RotatingSavings` struct is used to store the
 # information about a rotating savings game.
 struct RotatingSavings:
@@ -143,6 +185,38 @@ struct RotatingSavings:
     last_updated_at: uint256
 
 
+# @dev The number of low bits of a round record holding the claim
+# timestamp; the bits above them hold the amount claimed.
+ROUND_TIMESTAMP_BITS: constant(uint256) = 64
+
+
+# @dev The number of bits an amount can use, so that a pot of up to
+# 16 amounts, more than `MAX_PARTICIPANTS_COUNT`, fits in the bits of
+# a round record above the timestamp.
+AMOUNT_BITS: constant(uint256) = 256 - ROUND_TIMESTAMP_BITS - 4
+
+
+# @dev The maximum length of a participant membership proof,
+# i.e. the depth of a Merkle tree of `MAX_PARTICIPANTS_COUNT` leaves.
+MERKLE_PROOF_DEPTH: constant(uint256) = 4
+
+
+# @dev The `ParticipantsCommitment` struct holds the Merkle root of the
+# ordered participant list of a game created by `create_committed`,
+# and the number of participants.
+struct ParticipantsCommitment:
+    root: bytes32
+    count: uint256
+
+
+# @dev The `CreateSpec` struct holds the arguments of
+# one game created by `create_many`.
+struct CreateSpec:
+    asset: address
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT]
+    amount: uint256
+
+
 # @dev The `_token_id_to_rotating_savings` mapping is used to store the
 # information about a rotating savings game by its token ID.
 _token_id_to_rotating_savings: HashMap[uint256, RotatingSavings]
@@ -161,6 +235,37 @@ _deposited: HashMap[address, HashMap[uint256, HashMap[uint256, bool]]]
 _counter: uint256
 
 
+# @dev The `_token_id_to_commitment` mapping stores the participants
+# commitment of the games created by `create_committed`; it is empty
+# for every other game.
+_token_id_to_commitment: HashMap[uint256, ParticipantsCommitment]
+
+
+# @dev The `_deposited_seats` mapping stores, for the games created by
+# `create_committed`, a bitmap of the seats that deposited in each round.
+# token_id => index => seats bitmap
+_deposited_seats: HashMap[uint256, HashMap[uint256, uint256]]
+
+
+# @dev The `_token_id_to_cycle` mapping stores how many times a game
+# was renewed. The `_deposited` flags of a cycle are kept under its own
+# round keys (see `_round`), so a renewal does not have to clear them.
+_token_id_to_cycle: HashMap[uint256, uint256]
+
+
+# @dev The `_asset_liabilities` mapping stores, per asset, the funds held
+# for the open rounds of every game: all deposits less all claims and
+# recoveries. It is updated by `_transfer_in` and `_transfer_out`.
+_asset_liabilities: HashMap[address, uint256]
+
+
+# @dev The `_round_history` mapping stores a packed record of each
+# claimed round of the current cycle of a game: the amount claimed
+# shifted by `ROUND_TIMESTAMP_BITS`, or'ed with the claim timestamp.
+# token_id => index => record
+_round_history: HashMap[uint256, HashMap[uint256, uint256]]
+
+
 @deploy
 @payable
 def __init__(base_uri_: String[80], supported_assets: address[SUPPORTED_ASSETS_COUNT]):
@@ -194,34 +299,185 @@ def create(
     @return True if the rotating savings contract was created successfully.
     """
     assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
-    assert asset in SUPPORTED_ASSETS  # dev: unsupported asset
-    assert len(participants) > 0  # dev: no participants
-    assert len(participants) <= MAX_PARTICIPANTS_COUNT  # dev: too many participants
+    self._create(asset, participants, amount)
+    return True
 
-    # Increment the counter and get the token ID
-    token_id: uint256 = self._counter
-    self._counter += 1
 
-    # Mint the token to each participant
-    for participant: address in participants:
-        self._mint(participant, token_id, TOKEN_AMOUNT)
+@external
+@payable
+def create_many(
+    specs: DynArray[CreateSpec, MAX_CREATE_MANY_COUNT],
+) -> DynArray[uint256, MAX_CREATE_MANY_COUNT]:
+    """
+    @dev Creates a new rotating savings game for each spec, with
+         contiguous token IDs starting at `next_token_id()`.
+    @notice The creator must pay the protocol fee once per game in
+            the same transaction. If any spec is invalid, no game
+            is created.
+    @param specs The asset, participants and amount of each game.
+    @return The token IDs of the games, in the order of `specs`.
+    """
+    assert msg.value >= PROTOCOL_FEE * len(specs)  # dev: insufficient fee
+    assert len(specs) > 0  # dev: no games
+
+    # Allocate the token ID range with a single counter write
+    first_token_id: uint256 = self._counter
+    self._counter = first_token_id + len(specs)
+
+    token_ids: DynArray[uint256, MAX_CREATE_MANY_COUNT] = []
+    for i: uint256 in range(len(specs), bound=MAX_CREATE_MANY_COUNT):
+        # Groups of one partner usually share an asset, so it is only
+        # looked up in `SUPPORTED_ASSETS` when it changes
+        if i == 0 or specs[i].asset != specs[i - 1].asset:
+            assert specs[i].asset in SUPPORTED_ASSETS  # dev: unsupported asset
+        self._create_game(
+            first_token_id + i, specs[i].asset, specs[i].participants, specs[i].amount
+        )
+        token_ids.append(first_token_id + i)
+    return token_ids
 
-    # Initialize the rotating savings game
-    self._token_id_to_rotating_savings[token_id] = RotatingSavings(
-        participants=participants,
-        asset=asset,
-        amount=amount,
-        current_index=0,
-        total_deposited=0,
+
+@external
+@payable
+def deposit(token_id: uint256) -> bool:
+    """
+    @dev Deposits an amount of the asset into the rotating savings game.
+    @notice The participant must pay the protocol fee in the same transaction.
+    @param token_id The token ID of the rotating savings game.
+    @return True if the deposit was successful.
+    """
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+    self._deposit(token_id)
+    return True
+
+
+@external
+@payable
+def claim(token_id: uint256) -> bool:
+    """
+    @dev Claims the yield from the rotating savings game.
+    @notice The participant must pay the protocol fee in the same transaction.
+    @param token_id The token ID of the rotating savings game.
+    @return True if the claim was successful.
+    """
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+    self._claim(token_id)
+    return True
+
+
+@external
+def recover(token_id: uint256) -> bool:
+    """
+    @dev Recovers the asset from the rotating savings game.
+    @notice participants can recover only if the rotating savings wait time has passed.
+        This mechanism is designed to recover funds if for some reason the current
+        participant is not able to claim the funds.
+    @param token_id The token ID of the rotating savings game.
+    @return True if the recovery was successful.
+    """
+    self._recover(token_id)
+    return True
+
+
+@external
+@payable
+def renew(
+    token_id: uint256, order: DynArray[uint256, MAX_PARTICIPANTS_COUNT] = []
+) -> bool:
+    """
+    @dev Starts a new cycle of an ended rotating savings game, reusing
+         its storage and token ID instead of creating a new game.
+    @notice Only the creator can renew a game, and must pay the protocol
+            fee in the same transaction. The participants keep their
+            ERC-1155 tokens. Games created by `create_committed` cannot
+            be renewed.
+    @param token_id The token ID of the rotating savings game.
+    @param order The previous seat of each participant in the new
+           rotation, i.e. seat `i` goes to `participants[order[i]]`.
+           An empty `order` keeps the rotation.
+    @return True if the renewal was successful.
+    """
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+
+    # The fields are accessed one by one to only rewrite what changes
+    assert self._token_id_to_rotating_savings[token_id].ended  # dev: cannot renew
+    assert msg.sender == self._token_id_to_rotating_savings[token_id].creator  # dev: not creator
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT] = (
+        self._token_id_to_rotating_savings[token_id].participants
+    )
+    assert len(participants) > 0  # dev: cannot renew
+
+    if len(order) > 0:
+        assert len(order) == len(participants)  # dev: invalid order
+        seen: uint256 = 0
+        reordered: DynArray[address, MAX_PARTICIPANTS_COUNT] = []
+        for seat: uint256 in order:
+            assert seat < len(participants) and seen & (1 << seat) == 0  # dev: invalid order
+            seen |= 1 << seat
+            reordered.append(participants[seat])
+        participants = reordered
+        self._token_id_to_rotating_savings[token_id].participants = participants
+
+    # A finished cycle has no pot and was never recovered
+    self._token_id_to_rotating_savings[token_id].current_index = 0
+    self._token_id_to_rotating_savings[token_id].ended = False
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
+
+    cycle: uint256 = self._token_id_to_cycle[token_id] + 1
+    self._token_id_to_cycle[token_id] = cycle
+
+    log Renewed(
         token_id=token_id,
-        ended=False,
-        recovered=False,
-        creator=msg.sender,
-        created_at=block.timestamp,
-        last_updated_at=block.timestamp,
+        cycle=cycle,
+        participants=participants,
+        renewed_at=block.timestamp,
     )
+    return True
+
+
+@external
+@payable
+def create_committed(
+    asset: address,
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT],
+    amount: uint256,
+) -> bool:
+    """
+    @dev Creates a new rotating savings game that only stores the Merkle
+         root of the ordered participant list and its length, so that the
+         storage written does not grow with the participants.
+    @notice The participant list is logged once in `RotatingSavingsCreated`.
+            Participants then act through `deposit_committed`,
+            `claim_committed` and `recover_committed` with a proof of
+            their seat, built with `script/merkle.py`. No ERC-1155 tokens
+            are minted for these games. Every seat except the beneficiary's
+            deposits in each round, even if the same address holds several.
+    @param asset The asset to use for the rotating savings.
+    @param participants The participants depositing in the rotating savings.
+    @param amount The amount to use for the rotating savings.
+    @return True if the rotating savings contract was created successfully.
+    """
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+    assert asset in SUPPORTED_ASSETS  # dev: unsupported asset
+    assert len(participants) > 0  # dev: no participants
+    assert amount >> AMOUNT_BITS == 0  # dev: amount too large
+
+    token_id: uint256 = self._counter
+    self._counter += 1
+
+    root: bytes32 = self._participants_root(participants)
+    self._token_id_to_commitment[token_id] = ParticipantsCommitment(
+        root=root, count=len(participants)
+    )
+
+    # Only the non-zero fields are written
+    self._token_id_to_rotating_savings[token_id].asset = asset
+    self._token_id_to_rotating_savings[token_id].amount = amount
+    self._token_id_to_rotating_savings[token_id].token_id = token_id
+    self._token_id_to_rotating_savings[token_id].creator = msg.sender
+    self._token_id_to_rotating_savings[token_id].created_at = block.timestamp
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
 
-    # Log the event
     log RotatingSavingsCreated(
         participants=participants,
         asset=asset,
@@ -230,82 +486,82 @@ def create(
         creator=msg.sender,
         created_at=block.timestamp,
     )
+    log ParticipantsCommitted(token_id=token_id, root=root, count=len(participants))
     return True
 
 
 @external
 @payable
-def deposit(token_id: uint256) -> bool:
+def deposit_committed(
+    token_id: uint256, seat: uint256, proof: DynArray[bytes32, MERKLE_PROOF_DEPTH]
+) -> bool:
     """
-    @dev Deposits an amount of the asset into the rotating savings game.
+    @dev Deposits an amount of the asset for `seat` into the current
+         round of a game created by `create_committed`.
     @notice The participant must pay the protocol fee in the same transaction.
     @param token_id The token ID of the rotating savings game.
+    @param seat The position of the participant in the participant list.
+    @param proof The Merkle proof that the participant holds `seat`.
     @return True if the deposit was successful.
     """
-    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
-    assert self._can_deposit(msg.sender, token_id) # dev: cannot deposit
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+    assert self._can_deposit_committed(msg.sender, token_id, seat, proof)  # dev: cannot deposit
 
-    # Update the last updated at and the total deposited
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    rs.last_updated_at = block.timestamp
-    rs.total_deposited = rs.total_deposited + rs.amount
-    self._token_id_to_rotating_savings[token_id] = rs
+    # The fields are accessed one by one to skip copying the empty participants
+    amount: uint256 = self._token_id_to_rotating_savings[token_id].amount
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    total_deposited: uint256 = self._token_id_to_rotating_savings[token_id].total_deposited + amount
+    self._token_id_to_rotating_savings[token_id].total_deposited = total_deposited
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
+    self._deposited_seats[token_id][current_index] |= 1 << seat
 
-    # Set the deposited flag
-    self._deposited[msg.sender][token_id][rs.current_index] = True
-
-    # Transfer the amount to the contract
-    transferred: bool = extcall IERC20(rs.asset).transferFrom(
-        msg.sender, self, rs.amount, default_return_value=False
-    )
-    assert transferred  # dev: transfer failed
+    self._transfer_in(self._token_id_to_rotating_savings[token_id].asset, amount)
 
     log Deposited(
         participant=msg.sender,
         token_id=token_id,
-        index=rs.current_index,
-        amount=rs.amount,
-        total_deposited=rs.total_deposited,
+        index=current_index,
+        amount=amount,
+        total_deposited=total_deposited,
     )
     return True
 
 
 @external
 @payable
-def claim(token_id: uint256) -> bool:
+def claim_committed(
+    token_id: uint256, proof: DynArray[bytes32, MERKLE_PROOF_DEPTH]
+) -> bool:
     """
-    @dev Claims the yield from the rotating savings game.
+    @dev Claims the total deposited of the current round of a game
+         created by `create_committed`.
     @notice The participant must pay the protocol fee in the same transaction.
     @param token_id The token ID of the rotating savings game.
+    @param proof The Merkle proof that the participant holds the seat
+           of the current round.
     @return True if the claim was successful.
     """
-    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
-    assert self._can_claim(msg.sender, token_id) # dev: cannot claim
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+    assert self._can_claim_committed(msg.sender, token_id, proof)  # dev: cannot claim
 
-    # Update the last updated at, the current index, and the total deposited
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    total_deposited: uint256 = rs.total_deposited
-
-    rs.last_updated_at = block.timestamp
-    rs.current_index += 1
-    rs.total_deposited = 0
-    rs.ended = rs.current_index == len(rs.participants)
-    self._token_id_to_rotating_savings[token_id] = rs
+    total_deposited: uint256 = self._token_id_to_rotating_savings[token_id].total_deposited
+    index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    ended: bool = index + 1 == self._token_id_to_commitment[token_id].count
+    self._token_id_to_rotating_savings[token_id].current_index = index + 1
+    self._token_id_to_rotating_savings[token_id].total_deposited = 0
+    self._token_id_to_rotating_savings[token_id].ended = ended
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
+    self._record_round(token_id, index, total_deposited)
 
-    # Transfer the total deposited to the participant
-    transferred: bool = extcall IERC20(rs.asset).transfer(
-        msg.sender, total_deposited, default_return_value=False
-    )
-    assert transferred  # dev: transfer failed
+    self._transfer_out(self._token_id_to_rotating_savings[token_id].asset, total_deposited)
 
-    # Log the event
-    if rs.ended:
+    if ended:
         log Ended(token_id=token_id, last_updated_at=block.timestamp)
 
     log Claimed(
         participant=msg.sender,
         token_id=token_id,
-        index=rs.current_index-1,
+        index=index,
         amount=total_deposited,
         total_deposited=total_deposited,
     )
@@ -313,43 +569,63 @@ def claim(token_id: uint256) -> bool:
 
 
 @external
-def recover(token_id: uint256) -> bool:
+def recover_committed(
+    token_id: uint256, seat: uint256, proof: DynArray[bytes32, MERKLE_PROOF_DEPTH]
+) -> bool:
     """
-    @dev Recovers the asset from the rotating savings game.
-    @notice participants can recover only if the rotating savings wait time has passed.
-        This mechanism is designed to recover funds if for some reason the current
-        participant is not able to claim the funds.
+    @dev Recovers the deposit of `seat` from a stale game created
+         by `create_committed`.
     @param token_id The token ID of the rotating savings game.
+    @param seat The position of the participant in the participant list.
+    @param proof The Merkle proof that the participant holds `seat`.
     @return True if the recovery was successful.
     """
-    assert self._can_recover(msg.sender, token_id) # dev: cannot recover
-
-    # Burn the token
-    erc1155._burn(msg.sender, token_id, TOKEN_AMOUNT)
+    assert self._can_recover_committed(msg.sender, token_id, seat, proof)  # dev: cannot recover
 
-    # Update the rotating savings game
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    rs.total_deposited -= rs.amount
-    rs.recovered = True
-    self._token_id_to_rotating_savings[token_id] = rs
-    self._deposited[msg.sender][token_id][rs.current_index] = False
+    amount: uint256 = self._token_id_to_rotating_savings[token_id].amount
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    self._token_id_to_rotating_savings[token_id].total_deposited -= amount
+    self._token_id_to_rotating_savings[token_id].recovered = True
+    self._deposited_seats[token_id][current_index] &= ~(1 << seat)
 
-    # Transfer the amount to the participant
-    transferred: bool = extcall IERC20(rs.asset).transfer(
-        msg.sender, rs.amount, default_return_value=False
-    )
-    assert transferred  # dev: transfer failed
+    self._transfer_out(self._token_id_to_rotating_savings[token_id].asset, amount)
 
-    # Log the event
     log Recovered(
         participant=msg.sender,
         token_id=token_id,
-        index=rs.current_index,
-        amount=rs.amount,
+        index=current_index,
+        amount=amount,
     )
     return True
 
 
+@external
+@payable
+def __default__():
+    """
+    @dev Decodes tightly packed calldata and runs `create`, `deposit`
+         or `claim` with the same checks as the ABI entry points,
+         since calldata dominates transaction fees on rollups.
+    @notice All fields are big-endian. The layouts are:
+            - `deposit`, `claim`: opcode (1) | token ID (4).
+            - `create`: opcode (1) | asset index (1) | amount exponent (1) |
+              amount mantissa (8) | participant (20) for each participant,
+              where the amount is `mantissa * 10**exponent` and the asset
+              index points into `SUPPORTED_ASSETS`.
+            The token ID of a game created this way is logged in the
+            `RotatingSavingsCreated` event.
+    """
+    assert msg.value >= PROTOCOL_FEE  # dev: insufficient fee
+
+    # The frame of `__default__` is placed above the frames of everything
+    # it calls, so decoding happens in the callees to keep `deposit` and
+    # `claim` clear of the memory expansion cost of `create`.
+    if len(msg.data) == COMPACT_ROUND_CALL_SIZE:
+        self._round_call_compact()
+    else:
+        self._create_compact()
+
+
 @external
 def collect_protocol_fees():
     """
@@ -361,6 +637,9 @@ def collect_protocol_fees():
     send(ow.owner, self.balance)
 
 
+# @dev Derived views such as the current pot, the beneficiary and
+# `can_deposit`/`can_claim`/`can_recover` are served by `PasanakuLens`
+# (`src/pasanaku_lens.vy`), which reads the getters below.
 @external
 @view
 def rotating_savings(token_id: uint256) -> RotatingSavings:
@@ -372,133 +651,329 @@ def rotating_savings(token_id: uint256) -> RotatingSavings:
     return self._token_id_to_rotating_savings[token_id]
 
 
+@external
+@pure
+def protocol_fee() -> uint256:
+    """
+    @dev Returns the protocol fee.
+    @return The protocol fee.
+    """
+    return PROTOCOL_FEE
+
+
 @external
 @view
-def total_deposited(token_id: uint256) -> uint256:
+def supported_assets() -> address[SUPPORTED_ASSETS_COUNT]:
     """
-    @dev Returns the total deposited of the rotating savings game.
-    @param token_id The token ID of the rotating savings game.
-    @return The total deposited.
+    @dev Returns the supported assets.
+    @return The supported assets.
     """
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    return rs.total_deposited
+    return SUPPORTED_ASSETS
+
+
+@external
+@view
+def has_deposited(account: address, token_id: uint256, index: uint256) -> bool:
+    """
+    @dev Returns whether the account has deposited for the given token ID and index.
+    @param account The account to check.
+    @param token_id The token ID to check.
+    @param index The index to check.
+    @return Whether the account has deposited for the given token ID and index.
+    """
+    return self._deposited[account][token_id][self._round(token_id, index)]
 
 
 @external
 @view
-def expected_total_deposited(token_id: uint256, participant: address) -> uint256:
+def cycle(token_id: uint256) -> uint256:
     """
-    @dev Returns the expected total deposited of the rotating savings game.
+    @dev Returns how many times the rotating savings game was renewed.
     @param token_id The token ID of the rotating savings game.
-    @return The expected total deposited.
+    @return The current cycle, starting at 0.
     """
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    return rs.amount * (len(rs.participants) - self._deposits_count(participant, rs))
+    return self._token_id_to_cycle[token_id]
 
 
 @external
 @view
-def beneficiary(token_id: uint256) -> address:
+def round_history(token_id: uint256) -> DynArray[uint256, MAX_PARTICIPANTS_COUNT]:
     """
-    @dev Returns the current beneficiary of the rotating savings game.
+    @dev Returns a record of each round claimed in the current cycle
+         of the rotating savings game, in round order.
+    @notice Each record is `amount << ROUND_TIMESTAMP_BITS | timestamp`;
+            the beneficiary of round `i` is `participants[i]`.
     @param token_id The token ID of the rotating savings game.
-    @return The current beneficiary.
+    @return The packed round records.
     """
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    if not rs.ended:
-        return rs.participants[rs.current_index]
-    return empty(address)
+    history: DynArray[uint256, MAX_PARTICIPANTS_COUNT] = []
+    for index: uint256 in range(
+        self._token_id_to_rotating_savings[token_id].current_index,
+        bound=MAX_PARTICIPANTS_COUNT,
+    ):
+        history.append(self._round_history[token_id][index])
+    return history
 
 
 @external
 @view
-def can_claim(participant: address, token_id: uint256) -> bool:
+def asset_liabilities(asset: address) -> uint256:
     """
-    @dev Returns whether the participant should claim for the given token ID.
-    @param participant The participant to check.
-    @param token_id The token ID to check.
-    @return True if the participant can claim for the given token ID, false otherwise.
+    @dev Returns the funds of the asset held for the open rounds of all
+         games, which the contract's balance of the asset must cover.
+    @param asset The asset to check.
+    @return The total deposited in the asset across all games.
     """
-    return self._can_claim(participant, token_id)
+    return self._asset_liabilities[asset]
 
 
 @external
 @view
-def can_deposit(participant: address, token_id: uint256) -> bool:
+def participants_commitment(token_id: uint256) -> ParticipantsCommitment:
     """
-    @dev Returns whether the participant should deposit for the given token ID.
-    @param participant The participant to check.
-    @param token_id The token ID to check.
-    @return True if the participant can deposit for the given token ID, false otherwise.
+    @dev Returns the participants commitment of a game created by
+         `create_committed`, or an empty one for any other game.
+    @param token_id The token ID of the rotating savings game.
+    @return The Merkle root of the participant list and its length.
     """
-    return self._can_deposit(participant, token_id)
+    return self._token_id_to_commitment[token_id]
 
 
 @external
 @view
-def can_recover(participant: address, token_id: uint256) -> bool:
+def deposited_seats(token_id: uint256, index: uint256) -> uint256:
     """
-    @dev Returns whether the participant should recover for the given token ID.
-    @param participant The participant to check.
+    @dev Returns the bitmap of the seats that deposited in the given
+         round of a game created by `create_committed`.
     @param token_id The token ID to check.
-    @return True if the participant can recover for the given token ID, false otherwise.
+    @param index The index to check.
+    @return The bitmap, with bit `i` set if seat `i` deposited.
     """
-    return self._can_recover(participant, token_id)
+    return self._deposited_seats[token_id][index]
 
 
 @external
 @view
-def participants_count(token_id: uint256) -> uint256:
+def next_token_id() -> uint256:
+    """
+    @dev Returns the next token ID.
+    @return The next token ID.
+    """
+    return self._counter
+
+
+@internal
+def _create(
+    asset: address,
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT],
+    amount: uint256,
+) -> uint256:
+    """
+    @dev Internal function to create a new rotating savings game.
+    @param asset The asset to use for the rotating savings.
+    @param participants The participants depositing in the rotating savings.
+    @param amount The amount to use for the rotating savings.
+    @return The token ID of the rotating savings game.
     """
-    @dev Returns the participants count of the rotating savings game.
+    assert asset in SUPPORTED_ASSETS  # dev: unsupported asset
+
+    # Increment the counter and get the token ID
+    token_id: uint256 = self._counter
+    self._counter += 1
+
+    self._create_game(token_id, asset, participants, amount)
+    return token_id
+
+
+@internal
+def _create_game(
+    token_id: uint256,
+    asset: address,
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT],
+    amount: uint256,
+):
+    """
+    @dev Internal function to mint the tokens and store the rotating
+         savings game of an allocated token ID.
+    @notice The caller must check that `asset` is supported.
     @param token_id The token ID of the rotating savings game.
-    @return The participants count.
+    @param asset The asset to use for the rotating savings.
+    @param participants The participants depositing in the rotating savings.
+    @param amount The amount to use for the rotating savings.
     """
-    rs: RotatingSavings = self._token_id_to_rotating_savings[token_id]
-    return len(rs.participants)
+    assert len(participants) > 0  # dev: no participants
+    assert len(participants) <= MAX_PARTICIPANTS_COUNT  # dev: too many participants
+    assert amount >> AMOUNT_BITS == 0  # dev: amount too large
 
+    # Mint the token to each participant
+    for participant: address in participants:
+        self._mint(participant, token_id, TOKEN_AMOUNT)
 
-@external
-@pure
-def protocol_fee() -> uint256:
+    # Initialize the rotating savings game
+    self._token_id_to_rotating_savings[token_id] = RotatingSavings(
+        participants=participants,
+        asset=asset,
+        amount=amount,
+        current_index=0,
+        total_deposited=0,
+        token_id=token_id,
+        ended=False,
+        recovered=False,
+        creator=msg.sender,
+        created_at=block.timestamp,
+        last_updated_at=block.timestamp,
+    )
+
+    # Log the event
+    log RotatingSavingsCreated(
+        participants=participants,
+        asset=asset,
+        amount=amount,
+        token_id=token_id,
+        creator=msg.sender,
+        created_at=block.timestamp,
+    )
+
+
+@internal
+def _deposit(token_id: uint256):
     """
-    @dev Returns the protocol fee.
-    @return The protocol fee.
+    @dev Internal function to deposit the amount of the asset
+         into the current round of the rotating savings game.
+    @param token_id The token ID of the rotating savings game.
     """
-    return PROTOCOL_FEE
+    assert self._can_deposit(msg.sender, token_id) # dev: cannot deposit
 
+    # Update the last updated at and the total deposited; the fields are
+    # accessed one by one to skip copying the participants
+    amount: uint256 = self._token_id_to_rotating_savings[token_id].amount
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    total_deposited: uint256 = self._token_id_to_rotating_savings[token_id].total_deposited + amount
+    self._token_id_to_rotating_savings[token_id].total_deposited = total_deposited
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
 
-@external
-@view
-def supported_assets() -> address[SUPPORTED_ASSETS_COUNT]:
+    # Set the deposited flag
+    self._deposited[msg.sender][token_id][self._round(token_id, current_index)] = True
+
+    # Transfer the amount to the contract
+    self._transfer_in(self._token_id_to_rotating_savings[token_id].asset, amount)
+
+    log Deposited(
+        participant=msg.sender,
+        token_id=token_id,
+        index=current_index,
+        amount=amount,
+        total_deposited=total_deposited,
+    )
+
+
+@internal
+def _claim(token_id: uint256):
     """
-    @dev Returns the supported assets.
-    @return The supported assets.
+    @dev Internal function to claim the total deposited of the
+         current round of the rotating savings game.
+    @param token_id The token ID of the rotating savings game.
     """
-    return SUPPORTED_ASSETS
+    assert self._can_claim(msg.sender, token_id) # dev: cannot claim
 
+    # Update the last updated at, the current index, and the total deposited
+    total_deposited: uint256 = self._token_id_to_rotating_savings[token_id].total_deposited
+    index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    ended: bool = index + 1 == len(self._token_id_to_rotating_savings[token_id].participants)
+    self._token_id_to_rotating_savings[token_id].last_updated_at = block.timestamp
+    self._token_id_to_rotating_savings[token_id].current_index = index + 1
+    self._token_id_to_rotating_savings[token_id].total_deposited = 0
+    self._token_id_to_rotating_savings[token_id].ended = ended
+    self._record_round(token_id, index, total_deposited)
 
-@external
-@view
-def has_deposited(account: address, token_id: uint256, index: uint256) -> bool:
+    # Transfer the total deposited to the participant
+    self._transfer_out(self._token_id_to_rotating_savings[token_id].asset, total_deposited)
+
+    # Log the event
+    if ended:
+        log Ended(token_id=token_id, last_updated_at=block.timestamp)
+
+    log Claimed(
+        participant=msg.sender,
+        token_id=token_id,
+        index=index,
+        amount=total_deposited,
+        total_deposited=total_deposited,
+    )
+
+
+@internal
+def _recover(token_id: uint256):
     """
-    @dev Returns whether the account has deposited for the given token ID and index.
-    @param account The account to check.
-    @param token_id The token ID to check.
-    @param index The index to check.
-    @return Whether the account has deposited for the given token ID and index.
+    @dev Internal function to recover the deposited asset
+         from a stale rotating savings game.
+    @param token_id The token ID of the rotating savings game.
     """
-    return self._deposited[account][token_id][index]
+    assert self._can_recover(msg.sender, token_id) # dev: cannot recover
 
+    # Burn the token
+    erc1155._burn(msg.sender, token_id, TOKEN_AMOUNT)
 
-@external
-@view
-def next_token_id() -> uint256:
+    # Update the rotating savings game
+    amount: uint256 = self._token_id_to_rotating_savings[token_id].amount
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    self._token_id_to_rotating_savings[token_id].total_deposited -= amount
+    self._token_id_to_rotating_savings[token_id].recovered = True
+    self._deposited[msg.sender][token_id][self._round(token_id, current_index)] = False
+
+    # Transfer the amount to the participant
+    self._transfer_out(self._token_id_to_rotating_savings[token_id].asset, amount)
+
+    # Log the event
+    log Recovered(
+        participant=msg.sender,
+        token_id=token_id,
+        index=current_index,
+        amount=amount,
+    )
+
+
+@internal
+def _round_call_compact():
     """
-    @dev Returns the next token ID.
-    @return The next token ID.
+    @dev Internal function to decode a compact `deposit`
+         or `claim` call and run it.
     """
-    return self._counter
+    op: uint256 = convert(slice(msg.data, 0, 1), uint256)
+    token_id: uint256 = convert(slice(msg.data, 1, COMPACT_ROUND_CALL_SIZE - 1), uint256)
+    if op == COMPACT_DEPOSIT:
+        self._deposit(token_id)
+    elif op == COMPACT_CLAIM:
+        self._claim(token_id)
+    else:
+        raise  # dev: unknown opcode
+
+
+@internal
+def _create_compact():
+    """
+    @dev Internal function to decode a compact `create`
+         call and create a new rotating savings game.
+    """
+    assert len(msg.data) >= COMPACT_CREATE_HEADER_SIZE  # dev: invalid calldata
+    op: uint256 = convert(slice(msg.data, 0, 1), uint256)
+    assert op == COMPACT_CREATE  # dev: unknown opcode
+    participants_size: uint256 = len(msg.data) - COMPACT_CREATE_HEADER_SIZE
+    assert participants_size % 20 == 0  # dev: invalid calldata
+    assert participants_size <= 20 * MAX_PARTICIPANTS_COUNT  # dev: too many participants
+
+    asset_index: uint256 = convert(slice(msg.data, 1, 1), uint256)
+    assert asset_index < SUPPORTED_ASSETS_COUNT  # dev: unsupported asset
+    exponent: uint256 = convert(slice(msg.data, 2, 1), uint256)
+    mantissa: uint256 = convert(slice(msg.data, 3, 8), uint256)
+
+    participants: DynArray[address, MAX_PARTICIPANTS_COUNT] = []
+    for i: uint256 in range(participants_size // 20, bound=MAX_PARTICIPANTS_COUNT):
+        participants.append(
+            convert(slice(msg.data, COMPACT_CREATE_HEADER_SIZE + 20 * i, 20), address)
+        )
+
+    self._create(SUPPORTED_ASSETS[asset_index], participants, mantissa * 10**exponent)
 
 
 @internal
@@ -517,6 +992,19 @@ def _deposits_count(participant: address, rs: RotatingSavings) -> uint256:
     return participant_deposits
 
 
+@internal
+@view
+def _round(token_id: uint256, index: uint256) -> uint256:
+    """
+    @dev Internal function to return the `_deposited` key of the
+         round `index` of the current cycle of a game.
+    @param token_id The token ID of the rotating savings game.
+    @param index The index of the round in the current cycle.
+    @return The round key, equal to `index` in the first cycle.
+    """
+    return self._token_id_to_cycle[token_id] * MAX_PARTICIPANTS_COUNT + index
+
+
 @internal
 @view
 def _can_deposit(participant: address, token_id: uint256) -> bool:
@@ -534,9 +1022,8 @@ def _can_deposit(participant: address, token_id: uint256) -> bool:
         erc1155.total_supply[token_id] != empty(uint256)
         and participant in rs.participants
         and participant != rs.participants[rs.current_index]
-        and not rs.ended
         and not rs.recovered
-        and not self._deposited[participant][token_id][rs.current_index]
+        and not self._deposited[participant][token_id][self._round(token_id, rs.current_index)]
     )
 
 
@@ -560,7 +1047,6 @@ def _can_claim(participant: address, token_id: uint256) -> bool:
         erc1155.total_supply[token_id] != empty(uint256)
         and participant in rs.participants
         and participant == rs.participants[rs.current_index]
-        and not rs.ended
         and not rs.recovered
         and rs.total_deposited >= min_amount_to_claim
     )
@@ -585,12 +1071,234 @@ def _can_recover(participant: address, token_id: uint256) -> bool:
         and participant in rs.participants
         and participant != rs.participants[rs.current_index]
         and rs.total_deposited > 0
-        and self._deposited[participant][token_id][rs.current_index]
-        and not rs.ended
+        and self._deposited[participant][token_id][self._round(token_id, rs.current_index)]
         and block.timestamp - rs.last_updated_at >= DAYS_30
     )
 
 
+@internal
+@view
+def _can_deposit_committed(
+    participant: address,
+    token_id: uint256,
+    seat: uint256,
+    proof: DynArray[bytes32, MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Internal function to check if a participant can deposit for
+         `seat` in a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param seat The seat the participant claims to hold.
+    @param proof The Merkle proof that the participant holds `seat`.
+    @return True if the participant can deposit for `seat`, false otherwise.
+    """
+    if (
+        self._token_id_to_rotating_savings[token_id].ended
+        or self._token_id_to_rotating_savings[token_id].recovered
+    ):
+        return False
+
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    return (
+        seat != current_index
+        and self._deposited_seats[token_id][current_index] & (1 << seat) == 0
+        and self._verify_seat(token_id, seat, participant, proof)
+    )
+
+
+@internal
+@view
+def _can_claim_committed(
+    participant: address, token_id: uint256, proof: DynArray[bytes32, MERKLE_PROOF_DEPTH]
+) -> bool:
+    """
+    @dev Internal function to check if a participant can claim the current
+         round of a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param proof The Merkle proof that the participant holds the seat
+           of the current round.
+    @return True if the participant can claim, false otherwise.
+    """
+    if (
+        self._token_id_to_rotating_savings[token_id].ended
+        or self._token_id_to_rotating_savings[token_id].recovered
+    ):
+        return False
+
+    # Every seat but the current one deposits
+    count: uint256 = self._token_id_to_commitment[token_id].count
+    return (
+        count != 0
+        and self._token_id_to_rotating_savings[token_id].total_deposited
+        >= self._token_id_to_rotating_savings[token_id].amount * (count - 1)
+        and self._verify_seat(
+            token_id, self._token_id_to_rotating_savings[token_id].current_index, participant, proof
+        )
+    )
+
+
+@view
+@internal
+def _can_recover_committed(
+    participant: address,
+    token_id: uint256,
+    seat: uint256,
+    proof: DynArray[bytes32, MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Internal function to check if a participant can recover the deposit
+         of `seat` from a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param seat The seat the participant claims to hold.
+    @param proof The Merkle proof that the participant holds `seat`.
+    @return True if the participant can recover for `seat`, false otherwise.
+    """
+    if self._token_id_to_rotating_savings[token_id].ended:
+        return False
+
+    current_index: uint256 = self._token_id_to_rotating_savings[token_id].current_index
+    return (
+        seat != current_index
+        and self._token_id_to_rotating_savings[token_id].total_deposited > 0
+        and self._deposited_seats[token_id][current_index] & (1 << seat) != 0
+        and block.timestamp - self._token_id_to_rotating_savings[token_id].last_updated_at >= DAYS_30
+        and self._verify_seat(token_id, seat, participant, proof)
+    )
+
+
+@internal
+@view
+def _verify_seat(
+    token_id: uint256,
+    seat: uint256,
+    participant: address,
+    proof: DynArray[bytes32, MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Internal function to check a proof that `participant` holds
+         `seat` in the participant list committed for `token_id`.
+    @notice The seat is part of the leaf, so a proof cannot be
+            replayed for another seat.
+    @param token_id The token ID to check.
+    @param seat The position of the participant in the participant list.
+    @param participant The participant to check.
+    @param proof The sibling hashes from the leaf up to the root.
+    @return True if the proof is valid, false otherwise.
+    """
+    commitment: ParticipantsCommitment = self._token_id_to_commitment[token_id]
+    if seat >= commitment.count:
+        return False
+
+    node: bytes32 = self._leaf(seat, participant)
+    for sibling: bytes32 in proof:
+        node = self._hash_pair(node, sibling)
+    return node == commitment.root
+
+
+@internal
+@pure
+def _participants_root(participants: DynArray[address, MAX_PARTICIPANTS_COUNT]) -> bytes32:
+    """
+    @dev Internal function to compute the Merkle root of the ordered
+         participant list.
+    @notice Leaves are hashed pairwise level by level; the last node of
+            a level with an odd length is carried up unchanged.
+    @param participants The participants of the rotating savings game.
+    @return The Merkle root.
+    """
+    nodes: DynArray[bytes32, MAX_PARTICIPANTS_COUNT] = []
+    for participant: address in participants:
+        assert participant != empty(address)  # dev: zero address participant
+        nodes.append(self._leaf(len(nodes), participant))
+
+    count: uint256 = len(nodes)
+    for _: uint256 in range(MERKLE_PROOF_DEPTH):
+        if count == 1:
+            break
+        # Each parent only reads nodes at or after its own position
+        for i: uint256 in range(count // 2, bound=MAX_PARTICIPANTS_COUNT):
+            nodes[i] = self._hash_pair(nodes[2 * i], nodes[2 * i + 1])
+        if count % 2 == 1:
+            nodes[count // 2] = nodes[count - 1]
+        count = (count + 1) // 2
+    return nodes[0]
+
+
+@internal
+@pure
+def _leaf(seat: uint256, participant: address) -> bytes32:
+    """
+    @dev Internal function to hash the leaf of `participant` at `seat`.
+    @notice The leaf is hashed twice so that it cannot be mistaken
+            for an inner node of the tree.
+    @param seat The position of the participant in the participant list.
+    @param participant The participant.
+    @return The leaf hash.
+    """
+    return keccak256(keccak256(abi_encode(seat, participant)))
+
+
+@internal
+@pure
+def _hash_pair(a: bytes32, b: bytes32) -> bytes32:
+    """
+    @dev Internal function to hash a sorted pair of nodes.
+    @param a The first 32-byte node.
+    @param b The second 32-byte node.
+    @return The parent node.
+    """
+    if convert(a, uint256) < convert(b, uint256):
+        return keccak256(concat(a, b))
+    return keccak256(concat(b, a))
+
+
+@internal
+def _record_round(token_id: uint256, index: uint256, amount: uint256):
+    """
+    @dev Internal function to record the amount claimed in
+         round `index` and the time of the claim.
+    @notice Creation bounds the amount so that every pot fits in the
+            192 bits above the timestamp.
+    @param token_id The token ID of the rotating savings game.
+    @param index The index of the claimed round.
+    @param amount The amount claimed.
+    """
+    self._round_history[token_id][index] = amount << ROUND_TIMESTAMP_BITS | block.timestamp
+
+
+@internal
+def _transfer_in(asset: address, amount: uint256):
+    """
+    @dev Internal function to pull `amount` of `asset` from the caller
+         and add it to the liabilities of the asset.
+    @param asset The asset of the rotating savings game.
+    @param amount The amount to transfer.
+    """
+    self._asset_liabilities[asset] += amount
+    transferred: bool = extcall IERC20(asset).transferFrom(
+        msg.sender, self, amount, default_return_value=False
+    )
+    assert transferred  # dev: transfer failed
+
+
+@internal
+def _transfer_out(asset: address, amount: uint256):
+    """
+    @dev Internal function to send `amount` of `asset` to the caller
+         and remove it from the liabilities of the asset.
+    @param asset The asset of the rotating savings game.
+    @param amount The amount to transfer.
+    """
+    self._asset_liabilities[asset] -= amount
+    transferred: bool = extcall IERC20(asset).transfer(
+        msg.sender, amount, default_return_value=False
+    )
+    assert transferred  # dev: transfer failed
+
+
 @internal
 def _mint(owner: address, id: uint256, amount: uint256):
     """
@@ -0,0 +1,328 @@
+# pragma version ==0.4.3
+# @license MIT
+"""
+@title `PasanakuLens` Read-only views over `Pasanaku` games
+@custom:contract-name PasanakuLens
+@license MIT
+@author Rafael Abuawad <x.com/rabuawad_>
+@notice Derived views (pots, beneficiaries and whether a participant can
+        act) are served from this separately deployed contract so that
+        the core `Pasanaku` contract only keeps the state-changing entry
+        points and the getters this contract reads from.
+"""
+
+########################### TEST CONTRACT ###########################
+# This code is for testing purposes only, is not production ready and
+# is not audited. Everything is subject to change. Use at your own risk.
+#####################################################################
+
+# @dev We import the `pasanaku` module for its
+# `RotatingSavings` struct and its interface.
+import pasanaku
+
+
+# @dev The `Pasanaku` contract read by this lens.
+PASANAKU: public(immutable(pasanaku.__interface__))
+
+
+@deploy
+def __init__(pasanaku_: address):
+    """
+    @param pasanaku_ The address of the `Pasanaku` contract.
+    """
+    PASANAKU = pasanaku.__interface__(pasanaku_)
+
+
+@external
+@view
+def total_deposited(token_id: uint256) -> uint256:
+    """
+    @dev Returns the total deposited of the rotating savings game.
+    @param token_id The token ID of the rotating savings game.
+    @return The total deposited.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    return rs.total_deposited
+
+
+@external
+@view
+def expected_total_deposited(token_id: uint256, participant: address) -> uint256:
+    """
+    @dev Returns the expected total deposited of the rotating savings game.
+    @notice In a game created by `create_committed`, every seat except
+            the beneficiary's deposits, whatever address holds it, so
+            `participant` is ignored.
+    @param token_id The token ID of the rotating savings game.
+    @param participant The participant to claim the pot.
+    @return The expected total deposited.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if len(rs.participants) == 0:
+        count: uint256 = (staticcall PASANAKU.participants_commitment(token_id)).count
+        if count != 0:
+            return rs.amount * (count - 1)
+    return rs.amount * (len(rs.participants) - self._deposits_count(participant, rs))
+
+
+@external
+@view
+def beneficiary(token_id: uint256) -> address:
+    """
+    @dev Returns the current beneficiary of the rotating savings game.
+    @param token_id The token ID of the rotating savings game.
+    @return The current beneficiary, or the zero address if the game ended
+            or was created by `create_committed`, since only the root of
+            its participant list is stored.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if not rs.ended and rs.current_index < len(rs.participants):
+        return rs.participants[rs.current_index]
+    return empty(address)
+
+
+@external
+@view
+def can_claim(participant: address, token_id: uint256) -> bool:
+    """
+    @dev Returns whether the participant should claim for the given token ID.
+    @notice Returns false for a game created by `create_committed`,
+            see `can_claim_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @return True if the participant can claim for the given token ID, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended:
+        return False
+
+    min_amount_to_claim: uint256 = rs.amount * (
+        len(rs.participants) - self._deposits_count(participant, rs)
+    )
+    return (
+        staticcall PASANAKU.total_supply(token_id) != empty(uint256)
+        and participant in rs.participants
+        and participant == rs.participants[rs.current_index]
+        and not rs.recovered
+        and rs.total_deposited >= min_amount_to_claim
+    )
+
+
+@external
+@view
+def can_deposit(participant: address, token_id: uint256) -> bool:
+    """
+    @dev Returns whether the participant should deposit for the given token ID.
+    @notice Returns false for a game created by `create_committed`,
+            see `can_deposit_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @return True if the participant can deposit for the given token ID, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended:
+        return False
+
+    return (
+        staticcall PASANAKU.total_supply(token_id) != empty(uint256)
+        and participant in rs.participants
+        and participant != rs.participants[rs.current_index]
+        and not rs.recovered
+        and not staticcall PASANAKU.has_deposited(participant, token_id, rs.current_index)
+    )
+
+
+@external
+@view
+def can_recover(participant: address, token_id: uint256) -> bool:
+    """
+    @dev Returns whether the participant should recover for the given token ID.
+    @notice Returns false for a game created by `create_committed`,
+            see `can_recover_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @return True if the participant can recover for the given token ID, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended:
+        return False
+
+    return (
+        staticcall PASANAKU.total_supply(token_id) != empty(uint256)
+        and participant in rs.participants
+        and participant != rs.participants[rs.current_index]
+        and rs.total_deposited > 0
+        and staticcall PASANAKU.has_deposited(participant, token_id, rs.current_index)
+        and block.timestamp - rs.last_updated_at >= pasanaku.DAYS_30
+    )
+
+
+@external
+@view
+def can_claim_committed(
+    participant: address,
+    token_id: uint256,
+    proof: DynArray[bytes32, pasanaku.MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Returns whether the participant should claim the current round
+         of a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param proof The Merkle proof that the participant holds the seat
+           of the current round.
+    @return True if the participant can claim, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended or rs.recovered:
+        return False
+
+    # Every seat but the current one deposits
+    count: uint256 = (staticcall PASANAKU.participants_commitment(token_id)).count
+    return (
+        count != 0
+        and rs.total_deposited >= rs.amount * (count - 1)
+        and self._verify_seat(token_id, rs.current_index, participant, proof)
+    )
+
+
+@external
+@view
+def can_deposit_committed(
+    participant: address,
+    token_id: uint256,
+    seat: uint256,
+    proof: DynArray[bytes32, pasanaku.MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Returns whether the participant should deposit for `seat` in
+         a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param seat The seat the participant claims to hold.
+    @param proof The Merkle proof that the participant holds `seat`.
+    @return True if the participant can deposit for `seat`, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended or rs.recovered:
+        return False
+
+    return (
+        seat != rs.current_index
+        and staticcall PASANAKU.deposited_seats(token_id, rs.current_index) & (1 << seat) == 0
+        and self._verify_seat(token_id, seat, participant, proof)
+    )
+
+
+@external
+@view
+def can_recover_committed(
+    participant: address,
+    token_id: uint256,
+    seat: uint256,
+    proof: DynArray[bytes32, pasanaku.MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Returns whether the participant should recover the deposit of
+         `seat` from a game created by `create_committed`.
+    @param participant The participant to check.
+    @param token_id The token ID to check.
+    @param seat The seat the participant claims to hold.
+    @param proof The Merkle proof that the participant holds `seat`.
+    @return True if the participant can recover for `seat`, false otherwise.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    if rs.ended:
+        return False
+
+    return (
+        seat != rs.current_index
+        and rs.total_deposited > 0
+        and staticcall PASANAKU.deposited_seats(token_id, rs.current_index) & (1 << seat) != 0
+        and block.timestamp - rs.last_updated_at >= pasanaku.DAYS_30
+        and self._verify_seat(token_id, seat, participant, proof)
+    )
+
+
+@external
+@view
+def participants_count(token_id: uint256) -> uint256:
+    """
+    @dev Returns the participants count of the rotating savings game.
+    @param token_id The token ID of the rotating savings game.
+    @return The participants count.
+    """
+    rs: pasanaku.RotatingSavings = self._rotating_savings(token_id)
+    return self._participants_count(token_id, rs)
+
+
+@internal
+@view
+def _rotating_savings(token_id: uint256) -> pasanaku.RotatingSavings:
+    """
+    @dev Internal function to read a rotating savings game from `Pasanaku`.
+    @param token_id The token ID of the rotating savings game.
+    @return The rotating savings game.
+    """
+    return staticcall PASANAKU.rotating_savings(token_id)
+
+
+@internal
+@view
+def _participants_count(token_id: uint256, rs: pasanaku.RotatingSavings) -> uint256:
+    """
+    @dev Internal function to return the participants count of a game,
+         including the games created by `create_committed`.
+    @param token_id The token ID of the rotating savings game.
+    @param rs The rotating savings game.
+    @return The participants count.
+    """
+    if len(rs.participants) != 0:
+        return len(rs.participants)
+    return (staticcall PASANAKU.participants_commitment(token_id)).count
+
+
+@internal
+@view
+def _verify_seat(
+    token_id: uint256,
+    seat: uint256,
+    participant: address,
+    proof: DynArray[bytes32, pasanaku.MERKLE_PROOF_DEPTH],
+) -> bool:
+    """
+    @dev Internal function to check a proof that `participant` holds
+         `seat` in the participant list committed for `token_id`, as
+         `Pasanaku` does.
+    @param token_id The token ID to check.
+    @param seat The position of the participant in the participant list.
+    @param participant The participant to check.
+    @param proof The sibling hashes from the leaf up to the root.
+    @return True if the proof is valid, false otherwise.
+    """
+    commitment: pasanaku.ParticipantsCommitment = staticcall PASANAKU.participants_commitment(
+        token_id
+    )
+    if seat >= commitment.count:
+        return False
+
+    node: bytes32 = pasanaku._leaf(seat, participant)
+    for sibling: bytes32 in proof:
+        node = pasanaku._hash_pair(node, sibling)
+    return node == commitment.root
+
+
+@internal
+@pure
+def _deposits_count(participant: address, rs: pasanaku.RotatingSavings) -> uint256:
+    """
+    @dev Internal function to return the number of deposits the participant should make.
+    @param participant The participant to check.
+    @param rs The rotating savings game to check.
+    @return The number of deposits the participant should make.
+    """
+    participant_deposits: uint256 = 0
+    for p: address in rs.participants:
+        if p == participant:
+            participant_deposits += 1
+    return participant_deposits
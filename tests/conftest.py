@@ -3,6 +3,7 @@ import boa
 
 from typing import NamedTuple
 from src import pasanaku as Pasanaku
+from src import pasanaku_lens as PasanakuLens
 from script import mock_erc20s
 
 
@@ -75,6 +76,11 @@ def pasanaku_contract(deployer, supported_assets):
         return Pasanaku.deploy(base_uri, asset_addresses)
 
 
+@pytest.fixture
+def lens_contract(pasanaku_contract):
+    return PasanakuLens.deploy(pasanaku_contract.address)
+
+
 @pytest.fixture
 def created_game(
     pasanaku_contract, deployer, test_accounts, protocol_fee, supported_assets
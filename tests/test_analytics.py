@@ -0,0 +1,219 @@
+import boa
+import pytest
+import random
+
+from script import analytics
+from script import mock_erc20s
+from script import model as Model
+
+DAYS_30 = 60 * 60 * 24 * 30
+
+
+def _by_pair(columns, field):
+    """Sum `field` per (token ID, account) pair over the cycles of each game."""
+    ret = {}
+    for token_id, account, value in zip(
+        columns["token_id"], columns["account"], columns[field]
+    ):
+        ret[(token_id, account)] = ret.get((token_id, account), 0) + value
+    return ret
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_metrics_match_model(seed):
+    rng = random.Random(seed)
+    accounts = [f"0x{i:040x}" for i in range(1, 17)]
+    assets = [f"0x{i:040x}" for i in range(0x100, 0x103)]
+    model = Model.Pasanaku(assets)
+    history = analytics.History(dict(zip(assets, (0, 6, 18))))
+
+    net = {}
+    timestamp = 0
+    for step in Model.random_trace(rng, model, accounts, assets, 3_000):
+        analytics.record_step(history, model, step)
+        timestamp = step.timestamp
+        action = step.action.removesuffix("_committed")
+        if step.reverted is None and action in ("deposit", "claim", "recover"):
+            key = (step.args[0], step.sender)
+            net[key] = net.get(key, 0) + (
+                -step.result if action == "deposit" else step.result
+            )
+    ledger = history.ledger()
+
+    flows = analytics.net_cash_flow(ledger)
+    assert {k: v for k, v in _by_pair(flows, "net").items() if v} == {
+        k: v for k, v in net.items() if v
+    }
+
+    obligations = {}
+    defaults = {}
+    pots = dict.fromkeys(assets, 0)
+    for token_id, rs in model.games.items():
+        if rs.ended:
+            continue
+        pots[rs.asset] += rs.total_deposited
+        stalled = rs.recovered or timestamp - rs.last_updated_at >= DAYS_30
+        current = rs.current_index
+        committed = token_id in model.commitments
+        participants = model.commitments.get(token_id, rs.participants)
+        for participant in set(participants):
+            if committed:
+                # Each seat but the beneficiary's deposits in every round
+                seats = [s for s, p in enumerate(participants) if p == participant]
+                owed = [
+                    s
+                    for s in seats
+                    if s != current
+                    and not model.deposited_seats(token_id, current) & 1 << s
+                ]
+                rounds = len(owed) + sum(
+                    len(seats) - (participants[r] == participant)
+                    for r in range(current + 1, len(participants))
+                )
+                missing = bool(owed)
+            else:
+                deposited = model.has_deposited(participant, token_id, current)
+                rounds = (
+                    sum(p != participant for p in participants[current:]) - deposited
+                )
+                missing = participants[current] != participant and not deposited
+            if rounds <= 0:
+                continue
+            obligations[(token_id, participant)] = rounds * rs.amount
+            paid = participant in participants[:current]
+            if paid and stalled and missing:
+                defaults[(token_id, participant)] = rounds * rs.amount
+
+    assert _by_pair(analytics.outstanding_obligations(ledger), "amount") == obligations
+    assert (
+        _by_pair(analytics.defaults_after_payout(ledger, timestamp), "outstanding")
+        == defaults
+    )
+    risk = analytics.pot_at_risk(ledger, timestamp)
+    assert dict(zip(risk["asset"], risk["pot"])) == {
+        asset: pot for asset, pot in pots.items() if asset in set(risk["asset"])
+    }
+
+
+def test_history_from_contract_logs(pasanaku_contract, supported_assets, test_accounts):
+    history = analytics.History(mock_erc20s.decimals(supported_assets))
+    asset = supported_assets[7]  # USDC, 6 decimals
+    players = test_accounts[:3]
+    amount = 100 * 10**6
+    for player in players:
+        asset.faucet(player, amount * 10)
+        with boa.env.prank(player):
+            asset.approve(pasanaku_contract.address, amount * 10)
+
+    def call(sender, fn, *args):
+        with boa.env.prank(sender):
+            fn(*args)
+        for event in pasanaku_contract.get_logs():
+            history.record_log(event, boa.env.timestamp)
+
+    call(players[0], pasanaku_contract.create, asset.address, players, amount)
+    for player in players[1:]:
+        call(player, pasanaku_contract.deposit, 0)
+    call(players[0], pasanaku_contract.claim, 0)
+    call(players[2], pasanaku_contract.deposit, 0)
+
+    ledger = history.ledger()
+    flows = _by_pair(analytics.net_cash_flow(ledger), "net")
+    assert flows[(0, players[0])] == 2 * amount
+    assert flows[(0, players[1])] == -amount
+    assert flows[(0, players[2])] == -2 * amount
+
+    # Player 0 was paid and still owes rounds 1 and 2, player 1 owes round 2
+    obligations = _by_pair(analytics.outstanding_obligations(ledger), "amount")
+    assert obligations == {(0, players[0]): 2 * amount, (0, players[1]): amount}
+    assert (
+        len(analytics.defaults_after_payout(ledger, boa.env.timestamp)["token_id"]) == 0
+    )
+
+    stale = boa.env.timestamp + DAYS_30
+    defaults = analytics.defaults_after_payout(ledger, stale)
+    assert list(defaults["account"]) == [players[0]]
+    assert list(defaults["received"]) == [2 * amount]
+    assert list(defaults["outstanding"]) == [2 * amount]
+    risk = analytics.pot_at_risk(ledger, stale)
+    assert list(risk["asset"]) == [asset.address]
+    assert list(risk["pot"]) == [amount]
+    assert list(risk["at_risk"]) == [amount]
+    assert list(analytics.to_units(risk["pot"], risk["decimals"])) == [100.0]
+
+
+def test_committed_games_owe_per_seat():
+    asset = "0x" + "01" * 20
+    a, b, c = (f"0x{i:040x}" for i in range(1, 4))
+    history = analytics.History({asset: 0})
+    fields = {
+        "participants": [a, b, a, c],
+        "asset": asset,
+        "amount": 10,
+        "token_id": 0,
+        "created_at": 0,
+    }
+    history.record("RotatingSavingsCreated", fields, 0)
+    history.record("ParticipantsCommitted", {"token_id": 0, "count": 4}, 0)
+
+    def rounds():
+        obligations = analytics.outstanding_obligations(history.ledger())
+        return dict(zip(obligations["account"], obligations["rounds"]))
+
+    # Seat 0 deposits in rounds 1-3 and seat 2 in rounds 0, 1 and 3
+    assert rounds() == {a: 6, b: 3, c: 3}
+
+    def flow(name, participant, index, amount=10):
+        fields = {
+            "participant": participant,
+            "token_id": 0,
+            "index": index,
+            "amount": amount,
+        }
+        history.record(name, fields, 1)
+
+    for participant in (a, b, c):
+        flow("Deposited", participant, 0)
+    flow("Claimed", a, 0, 30)
+    # One deposit leaves the other seat of `a` missing from round 1
+    flow("Deposited", a, 1)
+    assert rounds() == {a: 4, b: 2, c: 2}
+
+    defaults = analytics.defaults_after_payout(history.ledger(), as_of=1 + DAYS_30)
+    assert list(defaults["account"]) == [a]
+    assert list(defaults["outstanding"]) == [40]
+
+
+@pytest.mark.parametrize("decimals", [6, 18])
+def test_amounts_stay_exact_in_base_units(decimals):
+    asset = "0x" + "01" * 20
+    players = [f"0x{i:040x}" for i in range(1, 4)]
+    # Far above 2**53, where float64 sums would drop the trailing unit
+    amount = 10**9 * 10**decimals + 1
+    history = analytics.History({asset: decimals})
+    history.record(
+        "RotatingSavingsCreated",
+        {
+            "participants": players,
+            "asset": asset,
+            "amount": amount,
+            "token_id": 0,
+            "created_at": 0,
+        },
+        0,
+    )
+    for player in players[1:]:
+        flow = {"participant": player, "token_id": 0, "index": 0, "amount": amount}
+        history.record("Deposited", flow, 1)
+
+    ledger = history.ledger()
+    flows = _by_pair(analytics.net_cash_flow(ledger), "deposited")
+    assert flows[(0, players[1])] == amount
+    risk = analytics.pot_at_risk(ledger, as_of=1)
+    assert list(risk["pot"]) == [2 * amount]
+    assert list(risk["decimals"]) == [decimals]
+    obligations = _by_pair(analytics.outstanding_obligations(ledger), "amount")
+    assert obligations[(0, players[0])] == 2 * amount
+    assert analytics.to_units(risk["pot"], risk["decimals"])[0] == pytest.approx(
+        2 * 10**9
+    )
@@ -0,0 +1,309 @@
+import boa
+import json
+import pytest
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from conftest import get_rotating_savings
+from script import feed as Feed
+from script import merkle
+
+DAYS_30 = 60 * 60 * 24 * 30
+AMOUNT = 100 * 10**6
+
+
+class BoaNode:
+    """Answers the JSON-RPC calls of `Feed` from the logs of calls run in boa.
+
+    Every call sent through `mine` is its own block.
+    """
+
+    def __init__(self):
+        # block number => (timestamp, logs)
+        self.blocks: dict[int, tuple[int, list[dict]]] = {}
+
+    def mine(self, sender, fn, *args, **kwargs):
+        with boa.env.prank(sender):
+            fn(*args, **kwargs)
+        number = boa.env.evm.patch.block_number
+        logs = [
+            {
+                "address": "0x" + address.hex(),
+                "topics": ["0x" + topic.to_bytes(32, "big").hex() for topic in topics],
+                "data": "0x" + data.hex(),
+                "blockNumber": hex(number),
+                "logIndex": hex(i),
+            }
+            for i, (_, address, topics, data) in enumerate(
+                fn.contract._computation.get_raw_log_entries()
+            )
+        ]
+        self.blocks[number] = (boa.env.timestamp, logs)
+        boa.env.time_travel(blocks=1)
+
+    def __call__(self, method, *params):
+        if method == "eth_blockNumber":
+            return hex(max(self.blocks, default=0))
+        if method == "eth_getBlockByNumber":
+            return {"timestamp": hex(self.blocks[int(params[0], 16)][0])}
+        if method == "eth_getLogs":
+            (query,) = params
+            ret = []
+            for number in range(
+                int(query["fromBlock"], 16), int(query["toBlock"], 16) + 1
+            ):
+                for log in self.blocks.get(number, (0, []))[1]:
+                    if (
+                        log["address"].lower() == query["address"].lower()
+                        and log["topics"][0] in query["topics"][0]
+                    ):
+                        ret.append(log)
+            return ret
+        raise ValueError(method)
+
+
+@pytest.fixture
+def node():
+    return BoaNode()
+
+
+@pytest.fixture
+def players(pasanaku_contract, supported_assets, test_accounts):
+    asset = supported_assets[0]
+    for player in test_accounts[:4]:
+        asset.faucet(player, AMOUNT * 20)
+        with boa.env.prank(player):
+            asset.approve(pasanaku_contract.address, AMOUNT * 20)
+    return test_accounts[:4]
+
+
+def test_projection_matches_contract(
+    pasanaku_contract, supported_assets, players, deployer, node
+):
+    asset = supported_assets[0].address
+    c = pasanaku_contract
+    feed = Feed.Feed(node, c.address, c.abi)
+
+    # Game 0 runs a full cycle and is renewed in a new order
+    node.mine(deployer, c.create, asset, players[:3], AMOUNT)
+    for beneficiary in players[:3]:
+        for player in players[:3]:
+            if player != beneficiary:
+                node.mine(player, c.deposit, 0)
+        node.mine(beneficiary, c.claim, 0)
+    node.mine(deployer, c.renew, 0, [1, 2, 0])
+    node.mine(players[2], c.deposit, 0)
+
+    # Game 1 goes stale and is recovered from
+    node.mine(deployer, c.create, asset, players, AMOUNT)
+    node.mine(players[1], c.deposit, 1)
+    boa.env.time_travel(seconds=DAYS_30)
+    node.mine(players[1], c.recover, 1)
+
+    # Game 2 is committed, and a game token changes hands
+    node.mine(deployer, c.create_committed, asset, players, AMOUNT)
+    node.mine(players[1], c.deposit_committed, 2, 1, merkle.proof(players, 1))
+    node.mine(players[0], c.safeTransferFrom, players[0], players[3], 0, 1, b"")
+
+    assert feed.poll() > 0
+    assert feed.poll() == 0
+    projection = feed.projection
+    for token_id in range(c.next_token_id()):
+        game = projection.game(token_id)
+        assert game.pop("cycle") == c.cycle(token_id)
+        expected = get_rotating_savings(c, token_id)._asdict()
+        if token_id == 2:
+            # The committed list is only known from the creation event
+            assert game.pop("participants") == tuple(players)
+            expected.pop("participants")
+        assert game == {k: v for k, v in expected.items() if k in game}
+        for player in players:
+            assert projection.balances.get((player, token_id), 0) == c.balanceOf(
+                player, token_id
+            )
+    assert projection.account(players[3])["balances"] == {0: 1, 1: 1}
+    assert projection.account(players[3])["games"] == [1, 2]
+
+
+def test_subscribers_receive_topic_deltas(
+    pasanaku_contract, supported_assets, players, deployer, node
+):
+    c = pasanaku_contract
+    feed = Feed.Feed(node, c.address, c.abi)
+    node.mine(deployer, c.create, supported_assets[0].address, players[:2], AMOUNT)
+    feed.poll()
+
+    game_queue, snapshots = feed.subscribe(games=[0])
+    account_queue, _ = feed.subscribe(accounts=[players[1]])
+    other_queue, _ = feed.subscribe(games=[1])
+    assert snapshots[0].payload["total_deposited"] == 0
+
+    node.mine(players[1], c.deposit, 0)
+    feed.poll()
+    delta = game_queue.get_nowait()
+    assert delta.topic == "game:0"
+    assert delta.payload["event"] == "Deposited"
+    assert delta.payload["changes"] == {
+        "total_deposited": AMOUNT,
+        "last_updated_at": node.blocks[delta.payload["block"]][0],
+    }
+    delta = account_queue.get_nowait()
+    assert delta.payload == {
+        "event": "Deposited",
+        "block": delta.payload["block"],
+        "token_id": 0,
+        "index": 0,
+        "amount": AMOUNT,
+    }
+    assert game_queue.empty() and account_queue.empty() and other_queue.empty()
+
+
+class FlakyNode:
+    """Wraps a `BoaNode`, failing `failures` calls of `method` after `skip` succeed."""
+
+    def __init__(self, node, method, failures, skip=0):
+        self.node = node
+        self.method = method
+        self.failures = failures
+        self.skip = skip
+
+    def __call__(self, method, *params):
+        if method == self.method and self.failures > 0:
+            if self.skip == 0:
+                self.failures -= 1
+                raise ConnectionError(f"{method} failed")
+            self.skip -= 1
+        return self.node(method, *params)
+
+
+def test_poll_does_not_apply_events_twice_after_a_failing_rpc(
+    pasanaku_contract, supported_assets, players, deployer, node
+):
+    c = pasanaku_contract
+    # The timestamp of the last block fails after the other two were fetched
+    rpc = FlakyNode(node, "eth_getBlockByNumber", failures=1, skip=2)
+    feed = Feed.Feed(rpc, c.address, c.abi)
+    node.mine(deployer, c.create, supported_assets[0].address, players[:3], AMOUNT)
+    node.mine(players[1], c.deposit, 0)
+    node.mine(players[2], c.deposit, 0)
+    queue, _ = feed.subscribe(games=[0])
+
+    with pytest.raises(ConnectionError):
+        feed.poll()
+    assert rpc.skip == 0
+    assert feed.projection.game(0) is None and queue.empty()
+
+    assert feed.poll() > 0
+    assert feed.projection.game(0)["total_deposited"] == 2 * AMOUNT
+    deposits = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert [d.payload["event"] for d in deposits].count("Deposited") == 2
+
+    # Fetching the same blocks again skips the events already applied
+    feed.next_block = 0
+    assert feed.poll() == 0
+    assert feed.projection.game(0)["total_deposited"] == 2 * AMOUNT
+    assert queue.empty()
+
+
+def test_run_logs_and_retries_a_failing_rpc(
+    pasanaku_contract, supported_assets, players, deployer, node, caplog
+):
+    c = pasanaku_contract
+    feed = Feed.Feed(FlakyNode(node, "eth_getLogs", failures=3), c.address, c.abi)
+    node.mine(deployer, c.create, supported_assets[0].address, players[:2], AMOUNT)
+
+    stop = threading.Event()
+    runner = threading.Thread(target=feed.run, args=(stop, 0.01))
+    with caplog.at_level("ERROR", logger=Feed.__name__):
+        runner.start()
+        try:
+            for _ in range(500):
+                if feed.projection.game(0) is not None:
+                    break
+                stop.wait(0.01)
+        finally:
+            stop.set()
+            runner.join(timeout=5)
+
+    assert feed.projection.game(0)["participants"] == tuple(players[:2])
+    failures = [r for r in caplog.records if "failed, retrying" in r.getMessage()]
+    assert len(failures) == 3
+    # Each retry waits twice as long as the previous one
+    assert [r.args[1] for r in failures] == [0.01, 0.02, 0.04]
+
+
+class _RpcHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        result = self.server.node(request["method"], *request["params"])
+        body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result})
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def test_sse_stream_over_json_rpc(
+    pasanaku_contract, supported_assets, players, deployer, node
+):
+    c = pasanaku_contract
+    rpc_server = ThreadingHTTPServer(("127.0.0.1", 0), _RpcHandler)
+    rpc_server.node = node
+    feed = Feed.Feed(Feed.JsonRpc(_start(rpc_server)), c.address, c.abi)
+    feed_server = Feed.FeedServer(("127.0.0.1", 0), feed, keepalive=0.1)
+    url = _start(feed_server)
+    try:
+        node.mine(deployer, c.create, supported_assets[0].address, players[:2], AMOUNT)
+        feed.poll()
+        with urllib.request.urlopen(f"{url}/games/0", timeout=5) as response:
+            game = json.load(response)
+        assert game["participants"] == list(players[:2])
+        assert game["amount"] == str(AMOUNT)
+
+        stream = urllib.request.urlopen(
+            f"{url}/stream?game=0&account={players[0]}", timeout=5
+        )
+
+        def read_event():
+            lines = []
+            while True:
+                line = stream.readline().decode().rstrip("\n")
+                if line.startswith(":"):
+                    continue
+                if not line and lines:
+                    return lines[0].removeprefix("event: "), json.loads(
+                        lines[1].removeprefix("data: ")
+                    )
+                if line:
+                    lines.append(line)
+
+        assert read_event() == ("snapshot", {"topic": "game:0", **game})
+        kind, account = read_event()
+        assert (kind, account["balances"]) == ("snapshot", {"0": "1"})
+
+        node.mine(players[1], c.deposit, 0)
+        node.mine(players[0], c.claim, 0)
+        feed.poll()
+        kind, delta = read_event()
+        assert (kind, delta["event"]) == ("delta", "Deposited")
+        assert delta["changes"]["total_deposited"] == str(AMOUNT)
+        kind, delta = read_event()
+        assert (delta["topic"], delta["event"]) == ("game:0", "Claimed")
+        assert delta["changes"]["current_index"] == "1"
+        kind, delta = read_event()
+        assert (delta["topic"], delta["amount"]) == (
+            f"account:{players[0]}",
+            str(AMOUNT),
+        )
+        stream.close()
+    finally:
+        feed_server.shutdown()
+        rpc_server.shutdown()
@@ -0,0 +1,258 @@
+import boa
+import pytest
+import random
+
+from boa import BoaError
+from conftest import get_rotating_savings
+from script import merkle
+from script import model as Model
+
+STEPS = 150
+FUNDING = 10**30
+
+
+def seat_proof(model, token_id, seat):
+    """Return the proof of `seat` in the committed list, or an empty one if there is none."""
+    participants = model.commitments.get(token_id, ())
+    if seat >= len(participants):
+        return []
+    return merkle.proof(list(participants), seat)
+
+
+def execute(pasanaku_contract, assets, model, step):
+    """Run one trace step on the contract; return (reverted, token_id, result)."""
+    if step.action == "warp":
+        boa.env.time_travel(seconds=step.timestamp - boa.env.timestamp)
+        return False, None, None
+
+    args = step.args
+    if step.action in ("create", "create_committed"):
+        asset_address, participants, amount = args
+        args = (asset_address, list(participants), amount)
+        token_id = pasanaku_contract.next_token_id()
+    else:
+        token_id = args[0]
+        rs = pasanaku_contract.rotating_savings(token_id)
+        asset_address = rs[1]
+        # Proofs are built from the committed list for the seat being acted for
+        if step.action == "claim_committed":
+            args = (token_id, seat_proof(model, token_id, rs[3]))
+        elif step.action.endswith("_committed"):
+            args = (*args, seat_proof(model, token_id, args[1]))
+        elif step.action == "transfer":
+            _, to, amount = args
+            args = (step.sender, to, token_id, amount, b"")
+    asset = assets.get(asset_address)
+    balance_before = asset.balanceOf(step.sender) if asset is not None else 0
+
+    # The model names the ERC-1155 transfer after what it does to a seat token
+    function = "safeTransferFrom" if step.action == "transfer" else step.action
+    with boa.env.prank(step.sender):
+        try:
+            getattr(pasanaku_contract, function)(*args)
+        except BoaError:
+            return True, token_id, None
+
+    if step.action in ("create", "create_committed"):
+        return False, token_id, token_id
+    if step.action == "renew":
+        return False, token_id, pasanaku_contract.cycle(token_id)
+    if step.action == "transfer":
+        return False, token_id, pasanaku_contract.balanceOf(args[1], token_id)
+    delta = asset.balanceOf(step.sender) - balance_before
+    return False, token_id, -delta if step.action.startswith("deposit") else delta
+
+
+def check_game(pasanaku_contract, lens_contract, model, token_id):
+    """Assert that the contract and the model hold the same state for `token_id`."""
+    expected = model.games[token_id]
+    timestamp = boa.env.timestamp
+    assert (
+        tuple(get_rotating_savings(pasanaku_contract, token_id)) == expected.as_tuple()
+    )
+    assert pasanaku_contract.total_supply(token_id) == model.total_supply[token_id]
+    assert pasanaku_contract.cycle(token_id) == model.cycles.get(token_id, 0)
+    assert pasanaku_contract.round_history(token_id) == model.round_history(token_id)
+    committed = model.commitments.get(token_id, ())
+    assert tuple(pasanaku_contract.participants_commitment(token_id)) == (
+        merkle.root(list(committed)) if committed else bytes(32),
+        len(committed),
+    )
+    assert pasanaku_contract.deposited_seats(
+        token_id, expected.current_index
+    ) == model.deposited_seats(token_id, expected.current_index)
+    # Seat tokens may have been transferred to accounts outside the game
+    holders = {owner for owner, held_id in model.balances if held_id == token_id}
+    for holder in holders | set(expected.participants):
+        assert pasanaku_contract.balanceOf(holder, token_id) == model.balance_of(
+            holder, token_id
+        )
+    for participant in set(expected.participants):
+        index = expected.current_index
+        assert pasanaku_contract.has_deposited(
+            participant, token_id, index
+        ) == model.has_deposited(participant, token_id, index)
+        assert lens_contract.can_deposit(participant, token_id) == model.can_deposit(
+            participant, token_id, timestamp
+        )
+        assert lens_contract.can_claim(participant, token_id) == model.can_claim(
+            participant, token_id, timestamp
+        )
+        assert lens_contract.can_recover(participant, token_id) == model.can_recover(
+            participant, token_id, timestamp
+        )
+    claim_proof = seat_proof(model, token_id, expected.current_index)
+    for seat, participant in enumerate(committed):
+        proof = seat_proof(model, token_id, seat)
+        assert lens_contract.can_deposit_committed(
+            participant, token_id, seat, proof
+        ) == model.can_deposit_committed(participant, token_id, seat, timestamp)
+        assert lens_contract.can_claim_committed(
+            participant, token_id, claim_proof
+        ) == model.can_claim_committed(participant, token_id, timestamp)
+        assert lens_contract.can_recover_committed(
+            participant, token_id, seat, proof
+        ) == model.can_recover_committed(participant, token_id, seat, timestamp)
+
+
+# Seeds whose traces succeed at least one claim, committed claim and transfer
+@pytest.mark.parametrize("seed", (4, 6, 7, 8))
+def test_model_matches_contract(
+    pasanaku_contract, lens_contract, test_accounts, supported_assets, seed
+):
+    """Replay a random model trace on the contract and flag any divergence."""
+    accounts = test_accounts
+    for asset in supported_assets:
+        for account in accounts:
+            with boa.env.prank(asset.owner()):
+                asset.faucet(account, FUNDING)
+            with boa.env.prank(account):
+                asset.approve(pasanaku_contract.address, FUNDING)
+
+    assets = {a.address: a for a in supported_assets}
+    trace = list(
+        Model.random_trace(
+            random.Random(seed),
+            Model.Pasanaku(assets),
+            accounts,
+            list(assets),
+            STEPS,
+            timestamp=boa.env.timestamp,
+        )
+    )
+    assert any(s.action == "claim" and s.reverted is None for s in trace)
+    assert any(s.action == "claim_committed" and s.reverted is None for s in trace)
+    assert any(s.action == "transfer" and s.reverted is None for s in trace)
+
+    # Step a fresh model alongside the contract so divergence is caught where it happens
+    model = Model.Pasanaku(assets)
+    for i, step in enumerate(trace):
+        Model.apply(model, step.action, step.sender, step.args, step.timestamp)
+        reverted, token_id, result = execute(pasanaku_contract, assets, model, step)
+        assert reverted == (step.reverted is not None), f"step {i}: {step}"
+        if reverted or token_id is None:
+            continue
+        assert result == step.result, f"step {i}: {step}"
+        check_game(pasanaku_contract, lens_contract, model, token_id)
+
+    assert pasanaku_contract.next_token_id() == model.counter
+    for address, asset in assets.items():
+        liabilities = pasanaku_contract.asset_liabilities(address)
+        assert liabilities == model.asset_liabilities(address)
+        assert liabilities == sum(
+            rs.total_deposited for rs in model.games.values() if rs.asset == address
+        )
+        # Every token held by the contract belongs to an open round
+        assert asset.balanceOf(pasanaku_contract.address) == liabilities
+
+
+def test_model_reverts_with_contract_dev_reasons(funded_game, pasanaku_contract):
+    token_id = funded_game["token_id"]
+    players = funded_game["players"]
+    asset = funded_game["asset"]
+    model = Model.Pasanaku([asset.address])
+    model.create(
+        boa.env.eoa, asset.address, players, funded_game["amount"], boa.env.timestamp
+    )
+
+    with pytest.raises(Model.Revert, match="cannot claim"):
+        model.claim(players[0], token_id, boa.env.timestamp)
+    with boa.env.prank(players[0]):
+        with boa.reverts(dev="cannot claim"):
+            pasanaku_contract.claim(token_id)
+
+    with pytest.raises(Model.Revert, match="cannot deposit"):
+        model.deposit(players[0], token_id, boa.env.timestamp)
+    with boa.env.prank(players[0]):
+        with boa.reverts(dev="cannot deposit"):
+            pasanaku_contract.deposit(token_id)
+
+    with pytest.raises(Model.Revert, match="unsupported asset"):
+        model.create(players[0], players[1], players, 1, boa.env.timestamp)
+
+
+def test_model_create_many_matches_contract(
+    pasanaku_contract, lens_contract, test_accounts, supported_assets
+):
+    assets = {a.address: a for a in supported_assets}
+    model = Model.Pasanaku(assets)
+    rng = random.Random(0)
+    specs = [
+        (
+            rng.choice(list(assets)),
+            tuple(rng.sample(test_accounts, rng.randint(1, len(test_accounts)))),
+            rng.randint(0, 10**6),
+        )
+        for _ in range(8)
+    ]
+
+    token_ids = model.create_many(boa.env.eoa, specs, boa.env.timestamp)
+    assert pasanaku_contract.create_many(specs) == token_ids
+    for token_id in token_ids:
+        check_game(pasanaku_contract, lens_contract, model, token_id)
+
+
+def test_model_committed_matches_contract(
+    pasanaku_contract, lens_contract, test_accounts, supported_assets
+):
+    a, b, c = test_accounts[:3]
+    assets = {x.address: x for x in supported_assets}
+    asset = supported_assets[0]
+    for account in (a, b, c):
+        asset.faucet(account, FUNDING)
+        with boa.env.prank(account):
+            asset.approve(pasanaku_contract.address, FUNDING)
+
+    # `a` holds seats 0 and 2, and deposits for both in round 1
+    timestamp = boa.env.timestamp
+    actions = [
+        ("create_committed", a, (asset.address, (a, b, a, c), 10**6)),
+        ("deposit_committed", b, (0, 1)),
+        ("deposit_committed", a, (0, 2)),
+        ("deposit_committed", c, (0, 3)),
+        ("claim_committed", a, (0,)),
+        ("deposit_committed", a, (0, 0)),
+        ("deposit_committed", a, (0, 2)),
+        ("deposit_committed", c, (0, 2)),
+        ("warp", None, ()),
+        ("recover_committed", b, (0, 2)),
+        ("recover_committed", a, (0, 2)),
+        ("deposit_committed", a, (0, 2)),
+    ]
+    model = Model.Pasanaku(assets)
+    reverts = []
+    for action, sender, args in actions:
+        if action == "warp":
+            timestamp += Model.DAYS_30
+        step = Model.apply(model, action, sender, args, timestamp)
+        reverts.append(step.reverted)
+        reverted, token_id, result = execute(pasanaku_contract, assets, model, step)
+        assert reverted == (step.reverted is not None), step
+        if token_id is not None and not reverted:
+            assert result == step.result, step
+            check_game(pasanaku_contract, lens_contract, model, token_id)
+
+    # Only the holder of a seat acts for it, and a recovered game takes no deposits
+    assert [i for i, reason in enumerate(reverts) if reason is not None] == [7, 9, 11]
+    assert model.games[0].recovered
+    assert model.deposited_seats(0, 1) == 1 << 0
@@ -1,11 +1,21 @@
 import boa
+import pytest
 import random
 
 from conftest import get_rotating_savings
+from eth.exceptions import Revert
+from eth_utils import function_abi_to_4byte_selector
+from script import compact
+from script import merkle
+from script import model as Model
+from src import pasanaku as Pasanaku
 
 # 30 days in seconds, for recover time condition
 DAYS_30 = 60 * 60 * 24 * 30
 
+# EIP-170 limit on the size of deployed code
+MAX_CODE_SIZE = 24576
+
 
 # --- Existing / owner / config ---
 
@@ -14,6 +24,12 @@ def test_pasanaku_owner(pasanaku_contract, deployer):
     assert pasanaku_contract.owner() == deployer
 
 
+def test_pasanaku_fits_the_code_size_limit(pasanaku_contract):
+    assert len(Pasanaku.compiler_data.bytecode_runtime) <= MAX_CODE_SIZE
+    # The deployed code also holds the immutables
+    assert len(boa.env.evm.get_code(pasanaku_contract.address)) <= MAX_CODE_SIZE
+
+
 def test_pasanaku_supported_assets(pasanaku_contract, supported_assets):
     pasanaku_contract_supported_assets = pasanaku_contract.supported_assets()
     assert len(pasanaku_contract_supported_assets) == len(supported_assets)
@@ -133,6 +149,51 @@ def test_create_increments_token_id(
     assert get_rotating_savings(pasanaku_contract, 1).token_id == 1
 
 
+def test_create_many_allocates_contiguous_token_ids(
+    created_game, pasanaku_contract, deployer, test_accounts, supported_assets
+):
+    specs = [
+        (supported_assets[0].address, test_accounts[:3], 100),
+        (supported_assets[0].address, test_accounts[3:5], 200),
+        (supported_assets[4].address, test_accounts[5:10], 300),
+    ]
+    with boa.env.prank(deployer):
+        token_ids = pasanaku_contract.create_many(specs)
+    logs = pasanaku_contract.get_logs()
+    created = [log for log in logs if type(log).__name__ == "RotatingSavingsCreated"]
+    assert [log.token_id for log in created] == token_ids
+    # `created_game` already holds token ID 0
+    assert token_ids == [1, 2, 3]
+    assert pasanaku_contract.next_token_id() == 4
+    for token_id, (asset, players, amount) in zip(token_ids, specs):
+        rs = get_rotating_savings(pasanaku_contract, token_id)
+        assert rs.token_id == token_id
+        assert rs.asset == asset
+        assert list(rs.participants) == list(players)
+        assert rs.amount == amount
+        assert rs.creator == deployer
+        assert pasanaku_contract.total_supply(token_id) == len(players)
+
+
+def test_create_many_reverts_invalid_spec(
+    created_game, pasanaku_contract, deployer, test_accounts, supported_assets
+):
+    asset = supported_assets[0].address
+    valid = (asset, test_accounts[:3], 100)
+    with boa.env.prank(deployer):
+        with boa.reverts(dev="no games"):
+            pasanaku_contract.create_many([])
+        with boa.reverts(dev="unsupported asset"):
+            pasanaku_contract.create_many(
+                [valid, (boa.env.generate_address(), test_accounts[:3], 100)]
+            )
+        with boa.reverts(dev="no participants"):
+            pasanaku_contract.create_many([valid, (asset, [], 100)])
+    # No game of a reverted batch is stored
+    assert pasanaku_contract.next_token_id() == 1
+    assert pasanaku_contract.total_supply(1) == 0
+
+
 # --- Deposit ---
 
 
@@ -186,13 +247,15 @@ def test_deposit_reverts_already_deposited(
             pasanaku_contract.deposit(token_id, value=protocol_fee)
 
 
-def test_deposit_success_updates_state(funded_game, pasanaku_contract, protocol_fee):
+def test_deposit_success_updates_state(
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
+):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
     amount = funded_game["amount"]
     with boa.env.prank(players[1]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == amount
+    assert lens_contract.total_deposited(token_id) == amount
 
 
 def test_deposit_transfers_erc20_to_contract(
@@ -209,7 +272,7 @@ def test_deposit_transfers_erc20_to_contract(
 
 
 def test_deposit_all_non_recipients_then_total(
-    funded_game, pasanaku_contract, protocol_fee
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
 ):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
@@ -218,7 +281,7 @@ def test_deposit_all_non_recipients_then_total(
         pasanaku_contract.deposit(token_id, value=protocol_fee)
     with boa.env.prank(players[2]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == 2 * amount
+    assert lens_contract.total_deposited(token_id) == 2 * amount
 
 
 # --- Claim ---
@@ -255,7 +318,7 @@ def test_claim_reverts_not_all_deposited(funded_game, pasanaku_contract, protoco
 
 
 def test_claim_success_advances_index_and_resets_total(
-    funded_game, pasanaku_contract, protocol_fee
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
 ):
     token_id = funded_game["token_id"]
     asset = funded_game["asset"]
@@ -271,7 +334,7 @@ def test_claim_success_advances_index_and_resets_total(
         pasanaku_contract.claim(token_id, value=protocol_fee)
     rs = get_rotating_savings(pasanaku_contract, token_id)
     assert rs.current_index == 1
-    assert pasanaku_contract.total_deposited(token_id) == 0
+    assert lens_contract.total_deposited(token_id) == 0
     expected_pot = amount * 2
     assert asset.balanceOf(recipient) == balance_before + expected_pot
 
@@ -399,7 +462,9 @@ def test_recover_reverts_time_condition(funded_game, pasanaku_contract, protocol
             pasanaku_contract.recover(token_id)
 
 
-def test_recover_success_after_30_days(funded_game, pasanaku_contract, protocol_fee):
+def test_recover_success_after_30_days(
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
+):
     token_id = funded_game["token_id"]
     asset = funded_game["asset"]
     players = funded_game["players"]
@@ -412,11 +477,372 @@ def test_recover_success_after_30_days(funded_game, pasanaku_contract, protocol_
     with boa.env.prank(players[1]):
         pasanaku_contract.recover(token_id)
     assert pasanaku_contract.balanceOf(players[1], token_id) == 0
-    assert pasanaku_contract.total_deposited(token_id) == 0
+    assert lens_contract.total_deposited(token_id) == 0
     assert get_rotating_savings(pasanaku_contract, token_id).recovered is True
     assert asset.balanceOf(players[1]) == balance_before + amount
 
 
+# --- Compact calldata ---
+
+
+def test_compact_opcodes_do_not_collide_with_selectors(pasanaku_contract):
+    selector_first_bytes = {
+        function_abi_to_4byte_selector(fn)[0]
+        for fn in pasanaku_contract.abi
+        if fn["type"] == "function"
+    }
+    for op in (compact.COMPACT_DEPOSIT, compact.COMPACT_CLAIM, compact.COMPACT_CREATE):
+        assert op not in selector_first_bytes
+
+
+def test_compact_create_stores_rotating_savings(
+    pasanaku_contract, deployer, test_accounts, supported_assets
+):
+    players = test_accounts[:4]
+    amount = 250 * 10**6
+    data = compact.encode_create(7, players, amount)
+    assert len(data) == 11 + 20 * len(players)
+    with boa.env.prank(deployer):
+        boa.env.raw_call(pasanaku_contract.address, data=data)
+    rs = get_rotating_savings(pasanaku_contract, 0)
+    assert list(rs.participants) == list(players)
+    assert rs.asset == supported_assets[7].address
+    assert rs.amount == amount
+    assert rs.creator == deployer
+    for player in players:
+        assert pasanaku_contract.balanceOf(player, 0) == 1
+
+
+def test_compact_create_reverts_invalid_calldata(
+    pasanaku_contract, deployer, test_accounts
+):
+    data = compact.encode_create(0, test_accounts[:2], 100)
+    with boa.env.prank(deployer):
+        with pytest.raises(Revert):
+            # Truncated participant address
+            boa.env.raw_call(pasanaku_contract.address, data=data[:-1])
+        with pytest.raises(Revert):
+            # Asset index out of range
+            boa.env.raw_call(
+                pasanaku_contract.address,
+                data=compact.encode_create(9, test_accounts[:2], 100),
+            )
+        with pytest.raises(Revert):
+            # No participants
+            boa.env.raw_call(
+                pasanaku_contract.address, data=compact.encode_create(0, [], 100)
+            )
+    assert pasanaku_contract.next_token_id() == 0
+
+
+def test_compact_round_call_reverts_unknown_opcode(funded_game, pasanaku_contract):
+    data = compact.encode_round_call(compact.COMPACT_CREATE, funded_game["token_id"])
+    with boa.env.prank(funded_game["players"][1]):
+        with pytest.raises(Revert):
+            boa.env.raw_call(pasanaku_contract.address, data=data)
+
+
+def test_compact_deposit_and_claim_full_round(
+    funded_game, pasanaku_contract, lens_contract
+):
+    token_id = funded_game["token_id"]
+    asset = funded_game["asset"]
+    players = funded_game["players"]
+    amount = funded_game["amount"]
+    with boa.env.prank(players[0]):
+        with pytest.raises(Revert):
+            boa.env.raw_call(
+                pasanaku_contract.address, data=compact.encode_deposit(token_id)
+            )
+    for player in players[1:]:
+        with boa.env.prank(player):
+            boa.env.raw_call(
+                pasanaku_contract.address, data=compact.encode_deposit(token_id)
+            )
+        assert pasanaku_contract.has_deposited(player, token_id, 0)
+    assert lens_contract.total_deposited(token_id) == 2 * amount
+
+    balance_before = asset.balanceOf(players[0])
+    with boa.env.prank(players[0]):
+        boa.env.raw_call(pasanaku_contract.address, data=compact.encode_claim(token_id))
+    assert asset.balanceOf(players[0]) == balance_before + 2 * amount
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert rs.current_index == 1
+    assert rs.total_deposited == 0
+
+
+def test_compact_split_amount():
+    assert compact.split_amount(100 * 10**6) == (1, 8)
+    assert compact.split_amount(123_450) == (12345, 1)
+    assert compact.split_amount(0) == (0, 0)
+    with pytest.raises(ValueError):
+        compact.split_amount(2**64 + 1)
+
+
+# --- Committed participants ---
+
+
+@pytest.fixture
+def committed_game(pasanaku_contract, deployer, test_accounts, supported_assets):
+    """Committed game with 4 seats, the first player holding seats 0 and 2."""
+    asset = supported_assets[0]
+    players = [test_accounts[0], test_accounts[1], test_accounts[0], test_accounts[2]]
+    amount = 100 * 10**6
+    for player in set(players):
+        asset.faucet(player, amount * 20)
+        with boa.env.prank(player):
+            asset.approve(pasanaku_contract.address, amount * 20)
+    with boa.env.prank(deployer):
+        pasanaku_contract.create_committed(asset.address, players, amount)
+    return {"token_id": 0, "asset": asset, "players": players, "amount": amount}
+
+
+def test_create_committed_stores_root_only(
+    committed_game, pasanaku_contract, lens_contract, deployer
+):
+    token_id = committed_game["token_id"]
+    players = committed_game["players"]
+    root, count = pasanaku_contract.participants_commitment(token_id)
+    assert root == merkle.root(players)
+    assert count == len(players)
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert list(rs.participants) == []
+    assert rs.asset == committed_game["asset"].address
+    assert rs.amount == committed_game["amount"]
+    assert rs.creator == deployer
+    assert pasanaku_contract.next_token_id() == 1
+    assert pasanaku_contract.total_supply(token_id) == 0
+    assert lens_contract.participants_count(token_id) == len(players)
+    assert lens_contract.beneficiary(token_id) == "0x" + "00" * 20
+
+
+def test_create_committed_reverts_zero_address(
+    pasanaku_contract, deployer, supported_assets
+):
+    with boa.env.prank(deployer):
+        with boa.reverts(dev="zero address participant"):
+            pasanaku_contract.create_committed(
+                supported_assets[0].address, [deployer, "0x" + "00" * 20], 100
+            )
+
+
+def test_committed_game_full_cycle(committed_game, pasanaku_contract):
+    token_id = committed_game["token_id"]
+    asset = committed_game["asset"]
+    players = committed_game["players"]
+    amount = committed_game["amount"]
+    for index, beneficiary in enumerate(players):
+        for seat, player in enumerate(players):
+            if seat == index:
+                continue
+            with boa.env.prank(player):
+                pasanaku_contract.deposit_committed(
+                    token_id, seat, merkle.proof(players, seat)
+                )
+        assert pasanaku_contract.deposited_seats(token_id, index) == 0b1111 ^ (
+            1 << index
+        )
+        balance_before = asset.balanceOf(beneficiary)
+        with boa.env.prank(beneficiary):
+            pasanaku_contract.claim_committed(token_id, merkle.proof(players, index))
+        assert asset.balanceOf(beneficiary) == balance_before + 3 * amount
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert rs.ended is True
+    assert rs.current_index == len(players)
+    assert rs.total_deposited == 0
+
+
+def test_lens_committed_game_views(committed_game, pasanaku_contract, lens_contract):
+    token_id = committed_game["token_id"]
+    players = committed_game["players"]
+    amount = committed_game["amount"]
+    # Seat 2 deposits even though its holder also holds seat 0
+    assert lens_contract.expected_total_deposited(token_id, players[0]) == 3 * amount
+    assert not lens_contract.can_deposit(players[1], token_id)
+
+    proofs = [merkle.proof(players, seat) for seat in range(len(players))]
+    assert lens_contract.can_deposit_committed(players[1], token_id, 1, proofs[1])
+    assert not lens_contract.can_deposit_committed(players[1], token_id, 3, proofs[3])
+    assert not lens_contract.can_deposit_committed(players[0], token_id, 0, proofs[0])
+    for seat in (1, 2, 3):
+        with boa.env.prank(players[seat]):
+            pasanaku_contract.deposit_committed(token_id, seat, proofs[seat])
+    assert not lens_contract.can_deposit_committed(players[1], token_id, 1, proofs[1])
+    assert lens_contract.can_claim_committed(players[0], token_id, proofs[0])
+    assert not lens_contract.can_claim_committed(players[1], token_id, proofs[0])
+
+    assert not lens_contract.can_recover_committed(players[1], token_id, 1, proofs[1])
+    boa.env.time_travel(seconds=DAYS_30)
+    assert lens_contract.can_recover_committed(players[1], token_id, 1, proofs[1])
+
+
+def test_committed_game_reverts_invalid_seat(committed_game, pasanaku_contract):
+    token_id = committed_game["token_id"]
+    players = committed_game["players"]
+    with boa.env.prank(players[1]):
+        with boa.reverts(dev="cannot deposit"):
+            # Proof of another seat
+            pasanaku_contract.deposit_committed(token_id, 1, merkle.proof(players, 3))
+        with boa.reverts(dev="cannot deposit"):
+            # Seat held by another participant
+            pasanaku_contract.deposit_committed(token_id, 3, merkle.proof(players, 3))
+        with boa.reverts(dev="cannot claim"):
+            pasanaku_contract.claim_committed(token_id, merkle.proof(players, 1))
+        with boa.reverts(dev="cannot deposit"):
+            # Committed games have no stored participants to deposit as
+            pasanaku_contract.deposit(token_id)
+    with boa.env.prank(players[0]):
+        with boa.reverts(dev="cannot deposit"):
+            # The beneficiary's seat does not deposit
+            pasanaku_contract.deposit_committed(token_id, 0, merkle.proof(players, 0))
+        with boa.reverts(dev="cannot claim"):
+            # Seats 1 to 3 have not deposited yet
+            pasanaku_contract.claim_committed(token_id, merkle.proof(players, 0))
+    with boa.env.prank(players[1]):
+        pasanaku_contract.deposit_committed(token_id, 1, merkle.proof(players, 1))
+        with boa.reverts(dev="cannot deposit"):
+            pasanaku_contract.deposit_committed(token_id, 1, merkle.proof(players, 1))
+
+
+def test_committed_game_recover_after_30_days(committed_game, pasanaku_contract):
+    token_id = committed_game["token_id"]
+    asset = committed_game["asset"]
+    players = committed_game["players"]
+    amount = committed_game["amount"]
+    with boa.env.prank(players[1]):
+        pasanaku_contract.deposit_committed(token_id, 1, merkle.proof(players, 1))
+        with boa.reverts(dev="cannot recover"):
+            pasanaku_contract.recover_committed(token_id, 1, merkle.proof(players, 1))
+    boa.env.time_travel(seconds=DAYS_30)
+    balance_before = asset.balanceOf(players[1])
+    with boa.env.prank(players[1]):
+        pasanaku_contract.recover_committed(token_id, 1, merkle.proof(players, 1))
+    assert asset.balanceOf(players[1]) == balance_before + amount
+    assert pasanaku_contract.deposited_seats(token_id, 0) == 0
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert rs.recovered is True
+    assert rs.total_deposited == 0
+    with boa.env.prank(players[2]):
+        with boa.reverts(dev="cannot deposit"):
+            pasanaku_contract.deposit_committed(token_id, 2, merkle.proof(players, 0))
+
+
+def test_merkle_proofs_verify_for_every_size():
+    players = [f"0x{i:040x}" for i in range(1, 13)]
+    for count in range(1, len(players) + 1):
+        root = merkle.root(players[:count])
+        for seat in range(count):
+            node = merkle.leaf(seat, players[seat])
+            for sibling in merkle.proof(players[:count], seat):
+                node = merkle.hash_pair(node, sibling)
+            assert node == root
+            assert len(merkle.proof(players[:count], seat)) <= 4
+
+
+# --- Renew ---
+
+
+def _play_cycle(pasanaku_contract, game, participants):
+    """Deposit and claim every round of the current cycle of `game`."""
+    token_id = game["token_id"]
+    for recipient in participants:
+        for p in participants:
+            if p != recipient:
+                with boa.env.prank(p):
+                    pasanaku_contract.deposit(token_id)
+        with boa.env.prank(recipient):
+            pasanaku_contract.claim(token_id)
+
+
+def test_renew_reverts_until_ended(funded_game, pasanaku_contract, deployer):
+    token_id = funded_game["token_id"]
+    with boa.env.prank(deployer):
+        with boa.reverts(dev="cannot renew"):
+            pasanaku_contract.renew(token_id)
+        with boa.reverts(dev="cannot renew"):
+            # Token ID that does not exist yet
+            pasanaku_contract.renew(token_id + 1)
+
+
+def test_renew_reverts_not_creator_or_invalid_order(
+    funded_game, pasanaku_contract, deployer
+):
+    token_id = funded_game["token_id"]
+    players = funded_game["players"]
+    _play_cycle(pasanaku_contract, funded_game, players)
+    with boa.env.prank(players[0]):
+        with boa.reverts(dev="not creator"):
+            pasanaku_contract.renew(token_id)
+    with boa.env.prank(deployer):
+        for order in ([0, 1], [0, 1, 1], [0, 1, 3], [2, 1, 0, 3]):
+            with boa.reverts(dev="invalid order"):
+                pasanaku_contract.renew(token_id, order)
+
+
+def test_renew_starts_new_cycle_in_place(
+    funded_game, pasanaku_contract, lens_contract, deployer
+):
+    token_id = funded_game["token_id"]
+    players = funded_game["players"]
+    amount = funded_game["amount"]
+    _play_cycle(pasanaku_contract, funded_game, players)
+    assert pasanaku_contract.cycle(token_id) == 0
+
+    boa.env.time_travel(seconds=60)
+    with boa.env.prank(deployer):
+        pasanaku_contract.renew(token_id, [2, 0, 1])
+    (event,) = pasanaku_contract.get_logs()
+    assert event.token_id == token_id
+    assert event.cycle == 1
+    assert list(event.participants) == [players[2], players[0], players[1]]
+    assert event.renewed_at == boa.env.timestamp
+
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert list(rs.participants) == [players[2], players[0], players[1]]
+    assert rs.current_index == 0
+    assert rs.ended is False
+    assert rs.last_updated_at == boa.env.timestamp
+    assert pasanaku_contract.cycle(token_id) == 1
+    assert pasanaku_contract.next_token_id() == 1
+    for player in players:
+        assert pasanaku_contract.balanceOf(player, token_id) == 1
+        # The flags of the first cycle do not carry over
+        assert not pasanaku_contract.has_deposited(player, token_id, 0)
+    assert lens_contract.beneficiary(token_id) == players[2]
+
+    balance_before = funded_game["asset"].balanceOf(players[2])
+    _play_cycle(pasanaku_contract, funded_game, list(rs.participants))
+    assert funded_game["asset"].balanceOf(players[2]) == balance_before
+    assert get_rotating_savings(pasanaku_contract, token_id).ended is True
+
+    # Keeping the rotation
+    with boa.env.prank(deployer):
+        pasanaku_contract.renew(token_id)
+    rs = get_rotating_savings(pasanaku_contract, token_id)
+    assert list(rs.participants) == [players[2], players[0], players[1]]
+    assert pasanaku_contract.cycle(token_id) == 2
+    with boa.env.prank(players[0]):
+        pasanaku_contract.deposit(token_id)
+    assert lens_contract.total_deposited(token_id) == amount
+
+
+def test_renew_reverts_committed_game(committed_game, pasanaku_contract, deployer):
+    token_id = committed_game["token_id"]
+    players = committed_game["players"]
+    for index, beneficiary in enumerate(players):
+        for seat, player in enumerate(players):
+            if seat != index:
+                with boa.env.prank(player):
+                    pasanaku_contract.deposit_committed(
+                        token_id, seat, merkle.proof(players, seat)
+                    )
+        with boa.env.prank(beneficiary):
+            pasanaku_contract.claim_committed(token_id, merkle.proof(players, index))
+    with boa.env.prank(deployer):
+        with boa.reverts(dev="cannot renew"):
+            pasanaku_contract.renew(token_id)
+
+
 # --- Collect protocol fees ---
 
 
@@ -461,6 +887,15 @@ def test_collect_protocol_fees_success_sends_balance_to_owner(
 # --- Views ---
 
 
+def test_lens_reads_pasanaku(pasanaku_contract, lens_contract):
+    assert lens_contract.PASANAKU() == pasanaku_contract.address
+    core_functions = {
+        fn["name"] for fn in pasanaku_contract.abi if fn["type"] == "function"
+    }
+    for name in ("total_deposited", "beneficiary", "can_deposit", "can_claim"):
+        assert name not in core_functions
+
+
 def test_rotating_savings_returns_struct(created_game, pasanaku_contract):
     token_id = created_game["token_id"]
     rs = get_rotating_savings(pasanaku_contract, token_id)
@@ -470,57 +905,171 @@ def test_rotating_savings_returns_struct(created_game, pasanaku_contract):
 
 
 def test_total_deposited_returns_current_pot(
-    funded_game, pasanaku_contract, protocol_fee
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
 ):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
     amount = funded_game["amount"]
-    assert pasanaku_contract.total_deposited(token_id) == 0
+    assert lens_contract.total_deposited(token_id) == 0
     with boa.env.prank(players[1]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == amount
+    assert lens_contract.total_deposited(token_id) == amount
     with boa.env.prank(players[2]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == 2 * amount
+    assert lens_contract.total_deposited(token_id) == 2 * amount
 
 
 def test_beneficiary_returns_current_recipient(
-    funded_game, pasanaku_contract, protocol_fee
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
 ):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
-    assert pasanaku_contract.beneficiary(token_id) == players[0]
+    assert lens_contract.beneficiary(token_id) == players[0]
     with boa.env.prank(players[1]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
     with boa.env.prank(players[2]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
     with boa.env.prank(players[0]):
         pasanaku_contract.claim(token_id, value=protocol_fee)
-    assert pasanaku_contract.beneficiary(token_id) == players[1]
+    assert lens_contract.beneficiary(token_id) == players[1]
 
 
 def test_can_recover_follows_implementation(
-    funded_game, pasanaku_contract, protocol_fee
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
 ):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
-    assert pasanaku_contract.can_recover(players[1], token_id) is False
+    assert lens_contract.can_recover(players[1], token_id) is False
     with boa.env.prank(players[1]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.can_recover(players[1], token_id) is False
+    assert lens_contract.can_recover(players[1], token_id) is False
     boa.env.time_travel(seconds=DAYS_30)
-    assert pasanaku_contract.can_recover(players[1], token_id) is True
+    assert lens_contract.can_recover(players[1], token_id) is True
 
 
-def test_can_claim_follows_implementation(funded_game, pasanaku_contract, protocol_fee):
+def test_can_claim_follows_implementation(
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
+):
     token_id = funded_game["token_id"]
     players = funded_game["players"]
     # Beneficiary cannot claim until all have deposited
-    assert pasanaku_contract.can_claim(players[0], token_id) is False
+    assert lens_contract.can_claim(players[0], token_id) is False
 
 
-def test_participants_count_returns_actual_count(created_game, pasanaku_contract):
-    assert pasanaku_contract.participants_count(created_game["token_id"]) == 3
+def test_participants_count_returns_actual_count(
+    created_game, pasanaku_contract, lens_contract
+):
+    assert lens_contract.participants_count(created_game["token_id"]) == 3
+
+
+def test_asset_liabilities_track_open_pots(
+    funded_game, committed_game, pasanaku_contract
+):
+    asset = funded_game["asset"]
+    amount = funded_game["amount"]
+    players = funded_game["players"]
+    committed = committed_game["players"]
+    assert committed_game["asset"] == asset
+    token_id = funded_game["token_id"]
+    committed_id = pasanaku_contract.next_token_id() - 1
+
+    def check(expected):
+        assert pasanaku_contract.asset_liabilities(asset.address) == expected
+        assert asset.balanceOf(pasanaku_contract.address) == expected
+
+    check(0)
+    for player in players[1:]:
+        with boa.env.prank(player):
+            pasanaku_contract.deposit(token_id)
+    with boa.env.prank(committed[1]):
+        pasanaku_contract.deposit_committed(committed_id, 1, merkle.proof(committed, 1))
+    check(3 * amount)
+    with boa.env.prank(players[0]):
+        pasanaku_contract.claim(token_id)
+    check(amount)
+    boa.env.time_travel(seconds=DAYS_30)
+    with boa.env.prank(committed[1]):
+        pasanaku_contract.recover_committed(committed_id, 1, merkle.proof(committed, 1))
+    check(0)
+    assert pasanaku_contract.asset_liabilities(committed[0]) == 0
+
+
+def test_round_history_records_claims(funded_game, pasanaku_contract, deployer):
+    token_id = funded_game["token_id"]
+    players = funded_game["players"]
+    amount = funded_game["amount"]
+    assert pasanaku_contract.round_history(token_id) == []
+
+    claimed_at = []
+    for round_index, recipient in enumerate(players):
+        boa.env.time_travel(seconds=60 * 60 * 24)
+        for p in players:
+            if p != recipient:
+                with boa.env.prank(p):
+                    pasanaku_contract.deposit(token_id)
+        with boa.env.prank(recipient):
+            pasanaku_contract.claim(token_id)
+        claimed_at.append(boa.env.timestamp)
+        history = pasanaku_contract.round_history(token_id)
+        assert len(history) == round_index + 1
+    assert [Model.unpack_round(r) for r in history] == [
+        (2 * amount, t) for t in claimed_at
+    ]
+    assert history[0] == Model.pack_round(2 * amount, claimed_at[0])
+
+    # A renewed game starts a new history
+    with boa.env.prank(deployer):
+        pasanaku_contract.renew(token_id)
+    assert pasanaku_contract.round_history(token_id) == []
+
+
+def test_round_history_records_committed_claims(committed_game, pasanaku_contract):
+    token_id = committed_game["token_id"]
+    players = committed_game["players"]
+    for seat in (1, 2, 3):
+        with boa.env.prank(players[seat]):
+            pasanaku_contract.deposit_committed(
+                token_id, seat, merkle.proof(players, seat)
+            )
+    with boa.env.prank(players[0]):
+        pasanaku_contract.claim_committed(token_id, merkle.proof(players, 0))
+    assert pasanaku_contract.round_history(token_id) == [
+        Model.pack_round(3 * committed_game["amount"], boa.env.timestamp)
+    ]
+
+
+def test_create_reverts_when_pots_would_not_fit_a_round_record(
+    pasanaku_contract, supported_assets, test_accounts
+):
+    asset = supported_assets[0].address
+    players = test_accounts[:2]
+    with boa.reverts(dev="amount too large"):
+        pasanaku_contract.create(asset, players, 2**188)
+    with boa.reverts(dev="amount too large"):
+        pasanaku_contract.create_many([(asset, players, 2**188)])
+    with boa.reverts(dev="amount too large"):
+        pasanaku_contract.create_committed(asset, players, 2**188)
+
+
+def test_round_history_records_the_largest_pot(
+    pasanaku_contract, supported_assets, test_accounts
+):
+    asset = supported_assets[0]
+    players = test_accounts
+    amount = 2**188 - 1
+    pasanaku_contract.create(asset.address, players, amount)
+    token_id = pasanaku_contract.next_token_id() - 1
+    for player in players[1:]:
+        asset.faucet(player, amount)
+        with boa.env.prank(player):
+            asset.approve(pasanaku_contract.address, amount)
+            pasanaku_contract.deposit(token_id)
+    with boa.env.prank(players[0]):
+        pasanaku_contract.claim(token_id)
+
+    pot = amount * (len(players) - 1)
+    (record,) = pasanaku_contract.round_history(token_id)
+    assert Model.unpack_round(record) == (pot, boa.env.timestamp)
 
 
 def test_protocol_fee_returns_constant(pasanaku_contract):
@@ -537,7 +1086,9 @@ def test_supported_assets_returns_deployed_list(pasanaku_contract, supported_ass
 # --- Full flow ---
 
 
-def test_full_round_one_claim(funded_game, pasanaku_contract, protocol_fee):
+def test_full_round_one_claim(
+    funded_game, pasanaku_contract, lens_contract, protocol_fee
+):
     token_id = funded_game["token_id"]
     asset = funded_game["asset"]
     players = funded_game["players"]
@@ -550,7 +1101,7 @@ def test_full_round_one_claim(funded_game, pasanaku_contract, protocol_fee):
     with boa.env.prank(players[0]):
         pasanaku_contract.claim(token_id, value=protocol_fee)
     assert get_rotating_savings(pasanaku_contract, token_id).current_index == 1
-    assert pasanaku_contract.total_deposited(token_id) == 0
+    assert lens_contract.total_deposited(token_id) == 0
     assert asset.balanceOf(players[0]) == balance_before + amount * 2
 
 
@@ -588,7 +1139,12 @@ def test_full_game_until_ended(
 
 
 def test_game_two_participants(
-    pasanaku_contract, deployer, test_accounts, protocol_fee, supported_assets
+    pasanaku_contract,
+    lens_contract,
+    deployer,
+    test_accounts,
+    protocol_fee,
+    supported_assets,
 ):
     """Full game with exactly 2 participants: two rounds then game ends."""
     asset = supported_assets[0]
@@ -602,8 +1158,8 @@ def test_game_two_participants(
         with boa.env.prank(p):
             asset.approve(pasanaku_contract.address, amount * 5)
     token_id = 0
-    assert pasanaku_contract.participants_count(token_id) == 2
-    assert pasanaku_contract.beneficiary(token_id) == players[0]
+    assert lens_contract.participants_count(token_id) == 2
+    assert lens_contract.beneficiary(token_id) == players[0]
     # Round 0: p1 deposits, p0 claims
     with boa.env.prank(players[1]):
         pasanaku_contract.deposit(token_id, value=protocol_fee)
@@ -620,11 +1176,16 @@ def test_game_two_participants(
     rs = get_rotating_savings(pasanaku_contract, token_id)
     assert rs.ended is True
     assert asset.balanceOf(players[1]) == balance_before_p1 + amount
-    assert not pasanaku_contract.can_claim(players[0], token_id)
+    assert not lens_contract.can_claim(players[0], token_id)
 
 
 def test_game_ten_participants_five_same_address(
-    pasanaku_contract, deployer, test_accounts, protocol_fee, supported_assets
+    pasanaku_contract,
+    lens_contract,
+    deployer,
+    test_accounts,
+    protocol_fee,
+    supported_assets,
 ):
     """Game with 10 participant slots where 5 slots are the same address.
     Deposit is tracked per (address, token_id, index), so addr_a can only deposit
@@ -648,24 +1209,29 @@ def test_game_ten_participants_five_same_address(
         with boa.env.prank(p):
             asset.approve(pasanaku_contract.address, amount * 10)
     token_id = 0
-    assert pasanaku_contract.participants_count(token_id) == 10
-    assert pasanaku_contract.beneficiary(token_id) == addr_a
+    assert lens_contract.participants_count(token_id) == 10
+    assert lens_contract.beneficiary(token_id) == addr_a
     # Round 0: addr_a is beneficiary so cannot deposit; only the 5 other addresses deposit
     # min_amount_to_claim for addr_a = amount * (10 - 5) = 5*amount, so 5 deposits suffice
     for p in others:
         with boa.env.prank(p):
             pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == 5 * amount
+    assert lens_contract.total_deposited(token_id) == 5 * amount
     balance_before = asset.balanceOf(addr_a)
     with boa.env.prank(addr_a):
         pasanaku_contract.claim(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == 0
+    assert lens_contract.total_deposited(token_id) == 0
     assert get_rotating_savings(pasanaku_contract, token_id).current_index == 1
     assert asset.balanceOf(addr_a) == balance_before + 5 * amount
 
 
 def test_game_ten_participants_stale_recovery(
-    pasanaku_contract, deployer, test_accounts, protocol_fee, supported_assets
+    pasanaku_contract,
+    lens_contract,
+    deployer,
+    test_accounts,
+    protocol_fee,
+    supported_assets,
 ):
     """Game of 10 participants: all non-beneficiaries deposit, then 30 days pass and one recovers."""
     asset = supported_assets[0]
@@ -683,7 +1249,7 @@ def test_game_ten_participants_stale_recovery(
     for i in range(1, 10):
         with boa.env.prank(players[i]):
             pasanaku_contract.deposit(token_id, value=protocol_fee)
-    assert pasanaku_contract.total_deposited(token_id) == 9 * amount
+    assert lens_contract.total_deposited(token_id) == 9 * amount
     boa.env.time_travel(seconds=DAYS_30)
     depositor = players[1]
     balance_before = asset.balanceOf(depositor)
@@ -692,8 +1258,8 @@ def test_game_ten_participants_stale_recovery(
         pasanaku_contract.recover(token_id)
     assert pasanaku_contract.balanceOf(depositor, token_id) == token_balance_before - 1
     assert asset.balanceOf(depositor) == balance_before + amount
-    assert pasanaku_contract.total_deposited(token_id) == 8 * amount
+    assert lens_contract.total_deposited(token_id) == 8 * amount
     assert get_rotating_savings(pasanaku_contract, token_id).recovered is True
     # After recovery, deposit and claim are disabled
-    assert not pasanaku_contract.can_claim(players[0], token_id)
-    assert not pasanaku_contract.can_deposit(players[2], token_id)
+    assert not lens_contract.can_claim(players[0], token_id)
+    assert not lens_contract.can_deposit(players[2], token_id)
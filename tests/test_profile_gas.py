@@ -0,0 +1,44 @@
+import boa
+from boa.vm import py_evm
+
+from script.profile_gas import SLOAD, SSTORE, Profiler
+
+
+def test_profiler_attributes_deposit(funded_game, pasanaku_contract, protocol_fee):
+    token_id = funded_game["token_id"]
+    players = funded_game["players"]
+    with Profiler() as profiler:
+        with boa.env.prank(players[1]):
+            pasanaku_contract.deposit(token_id, value=protocol_fee)
+
+    report = profiler.report()
+    assert list(report) == ["pasanaku.deposit"]
+    deposit = report["pasanaku.deposit"]
+    assert deposit["calls"] == 1
+    assert any("src/pasanaku.vy:_deposit" in line["stack"] for line in deposit["lines"])
+    assert sum(line["gas"] for line in deposit["lines"]) <= deposit["gas"]["max"]
+
+    slots = {}
+    for access in deposit["storage"]:
+        key = (access["op"], access["slot"])
+        slots.setdefault(key, []).append(access)
+    # The first read of the game is cold, later reads of the same slot are warm
+    game = slots[("SLOAD", f"_token_id_to_rotating_savings[{token_id}]")]
+    assert sum(a["cold"] for a in game) == 1
+    assert sum(a["warm"] for a in game) >= 1
+    assert ("SSTORE", f"_deposited[<address>][{token_id}][0]") in slots
+    assert ("SSTORE", "erc20.balanceOf[<address>]") in slots
+
+    stacks = profiler.collapsed_stacks()
+    assert all(s.startswith("pasanaku.deposit;") for s in stacks)
+    assert all(int(s.rsplit(" ", 1)[1]) > 0 for s in stacks)
+
+
+def test_profiler_is_inert_when_inactive(funded_game, pasanaku_contract):
+    profiler = Profiler()
+    with profiler:
+        assert SLOAD in py_evm._opcode_overrides
+    assert SLOAD not in py_evm._opcode_overrides
+    assert SSTORE not in py_evm._opcode_overrides
+    pasanaku_contract.next_token_id()
+    assert profiler.report() == {}